@@ -1,6 +1,5 @@
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -10,6 +9,7 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from core.mail import queue_mail
 from .serializers import (
     UserSerializer,
     UserRegistrationSerializer,
@@ -60,18 +60,14 @@ class UserViewSet(viewsets.ModelViewSet):
         html_message = render_to_string('accounts/email_verification.html', context)
         plain_message = render_to_string('accounts/email_verification.txt', context)
         
-        try:
-            send_mail(
-                'Verify your email address',
-                plain_message,
-                settings.DEFAULT_FROM_EMAIL,
-                [user.email],
-                html_message=html_message,
-                fail_silently=False
-            )
-        except Exception as e:
-            # Log the error but don't prevent registration
-            print(f"Error sending verification email: {str(e)}")
+        # Delivered by the outbox worker, so registration never waits on SMTP
+        queue_mail(
+            'Verify your email address',
+            plain_message,
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+            html_message=html_message
+        )
         
         # Generate tokens for automatic login
         refresh = RefreshToken.for_user(user)
@@ -148,13 +144,12 @@ class UserViewSet(viewsets.ModelViewSet):
             html_message = render_to_string('accounts/password_reset.html', context)
             plain_message = render_to_string('accounts/password_reset.txt', context)
             
-            send_mail(
+            queue_mail(
                 'Reset your password',
                 plain_message,
                 settings.DEFAULT_FROM_EMAIL,
                 [user.email],
-                html_message=html_message,
-                fail_silently=False
+                html_message=html_message
             )
             
             return Response(
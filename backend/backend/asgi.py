@@ -3,6 +3,12 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The Server-Sent Events endpoints (e.g. /api/donations/causes/{id}/stream/)
+hold one connection per viewer and must be served through this application,
+e.g. ``uvicorn backend.asgi:application``. The warmap GeoJSON streams and
+exports switch to async iterators here, so they are still sent
+incrementally.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',  # Added 'django.contrib.gis'
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -103,6 +104,22 @@ DATABASES = {
 }
 
 
+# Cache (local memory by default, e.g. django.core.cache.backends.redis.RedisCache in production)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Seconds a cached API response is kept; changes to its models invalidate it sooner
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds between writes of the blog post view counts kept in the cache,
+# made by `manage.py flush_view_counts --loop`
+BLOG_VIEW_COUNT_FLUSH_INTERVAL = config('BLOG_VIEW_COUNT_FLUSH_INTERVAL', default=60, cast=int)
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -177,6 +194,8 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET', default='')
+# Seconds before a Stripe API request is abandoned
+STRIPE_TIMEOUT = config('STRIPE_TIMEOUT', default=10, cast=int)
 
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -188,6 +207,16 @@ EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='')
 ADMIN_EMAIL = config('ADMIN_EMAIL', default='')
 
+# Outbox worker (python manage.py send_queued_mail --loop)
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+# Seconds before the first retry, doubled after every further failure
+EMAIL_OUTBOX_RETRY_DELAY = config('EMAIL_OUTBOX_RETRY_DELAY', default=60, cast=int)
+# Seconds a worker may spend on a claimed batch before other workers retry it
+EMAIL_OUTBOX_LEASE = config('EMAIL_OUTBOX_LEASE', default=300, cast=int)
+# Days the bodies of failed emails are kept for inspection before being cleared
+EMAIL_OUTBOX_RETENTION_DAYS = config('EMAIL_OUTBOX_RETENTION_DAYS', default=7, cast=int)
+
 # GeoDjango settings
 import os
 if os.name == 'nt':
@@ -211,3 +240,9 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
 }
+
+# Largest page a client may request from the warmap timeline endpoints
+WARMAP_MAX_PAGE_SIZE = config('WARMAP_MAX_PAGE_SIZE', default=100, cast=int)
+
+# Most items accepted by one warmap bulk request
+WARMAP_BULK_MAX_ITEMS = config('WARMAP_BULK_MAX_ITEMS', default=5000, cast=int)
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from core.versioning import bump_version
 from .models import Category, BlogPost, Comment
 
 @admin.register(Category)
@@ -26,4 +27,5 @@ class CommentAdmin(admin.ModelAdmin):
 
     def approve_comments(self, request, queryset):
         queryset.update(is_approved=True)
+        bump_version(Comment)
     approve_comments.short_description = "Approve selected comments"
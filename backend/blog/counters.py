@@ -0,0 +1,138 @@
+"""Batched post view counting.
+
+Reads only increment a per-post counter in the cache. The ``flush_view_counts``
+command writes the pending counts with a single ``view_count = view_count + n``
+UPDATE every ``BLOG_VIEW_COUNT_FLUSH_INTERVAL`` seconds, so retrieving a post
+never writes or locks its row.
+
+Posts with pending views are appended to a log of numbered slots
+(``blog:view_count:dirty:<n>``), so a flush only reads the posts viewed since
+the previous one. A per-post flag, set with ``add`` at every view, keeps a
+post in the log once between flushes. Slots are claimed with ``add`` too: a
+flush that finds a slot allocated but not written yet claims it first, and the
+viewer then logs the post in a new slot. Every step is atomic on every cache
+backend.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from core.versioning import bump_version
+from .models import BlogPost
+
+FLUSH_LOCK_KEY = 'blog:view_count:flush'
+DIRTY_SEQUENCE_KEY = 'blog:view_count:dirty'
+# Last slot of the log written to the database
+DIRTY_READ_KEY = 'blog:view_count:dirty_read'
+# Value of a slot a flush claimed before the viewer wrote it
+SKIPPED_SLOT = 0
+# Bounds how long an evicted log slot can keep a post from being logged again,
+# and how long a claimed slot is kept so the late viewer's add fails
+DIRTY_TIMEOUT = 3600
+
+
+def _counter_key(post_id):
+    return f'blog:view_count:{post_id}'
+
+
+def _dirty_key(post_id):
+    return f'blog:view_count:{post_id}:dirty'
+
+
+def _slot_key(slot):
+    return f'{DIRTY_SEQUENCE_KEY}:{slot}'
+
+
+def _incr(key):
+    """Increment a counter kept without expiry, creating it if missing."""
+    if cache.add(key, 1, timeout=None):
+        return 1
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def _mark_dirty(post_id):
+    """Log ``post_id`` unless it is already logged for the next flush."""
+    if not cache.add(_dirty_key(post_id), True, DIRTY_TIMEOUT):
+        return
+    while not cache.add(_slot_key(_incr(DIRTY_SEQUENCE_KEY)), post_id, timeout=None):
+        # A flush claimed the slot before it was written
+        pass
+
+
+def record_view(post_id):
+    """Count one view of ``post_id``."""
+    _incr(_counter_key(post_id))
+    _mark_dirty(post_id)
+
+
+def _read_log(slots):
+    """Return the post ids logged in ``slots``, claiming the unwritten ones."""
+    entries = cache.get_many(slots)
+    for slot in slots:
+        if slot not in entries:
+            if cache.add(slot, SKIPPED_SLOT, DIRTY_TIMEOUT):
+                entries[slot] = SKIPPED_SLOT
+            else:
+                # Written since get_many
+                entries[slot] = cache.get(slot, SKIPPED_SLOT)
+    return entries
+
+
+def _release_counts(post_ids, pending, slots, last_slot):
+    """Subtract the written counts, once the UPDATE has committed."""
+    # Views from now on log the posts again
+    cache.delete_many([_dirty_key(post_id) for post_id in post_ids])
+    for post_id, count in pending.items():
+        try:
+            remaining = cache.decr(_counter_key(post_id), count)
+        except ValueError:
+            # Evicted; the views it held were written
+            continue
+        if remaining > 0:
+            # Viewed while flushing, possibly before the flag was cleared
+            _mark_dirty(post_id)
+    cache.set(DIRTY_READ_KEY, last_slot, timeout=None)
+    cache.delete_many(slots)
+
+
+def flush_view_counts():
+    """Write pending view counts to the database and return how many were added."""
+    # Only one flusher may claim counts at a time
+    if not cache.add(FLUSH_LOCK_KEY, True, 60):
+        return 0
+    try:
+        last_slot = cache.get(DIRTY_SEQUENCE_KEY, 0)
+        first_slot = cache.get(DIRTY_READ_KEY, 0) + 1
+        if first_slot > last_slot + 1:
+            # The sequence was evicted and restarted
+            first_slot = 1
+        entries = _read_log([_slot_key(slot) for slot in range(first_slot, last_slot + 1)])
+        post_ids = {post_id for post_id in entries.values() if post_id != SKIPPED_SLOT}
+        # Claimed slots stay until they expire, so a late viewer cannot fill them
+        slots = [slot for slot, post_id in entries.items() if post_id != SKIPPED_SLOT]
+        counts = cache.get_many([_counter_key(post_id) for post_id in post_ids])
+        pending = {
+            post_id: counts[_counter_key(post_id)]
+            for post_id in post_ids
+            if counts.get(_counter_key(post_id))
+        }
+
+        with transaction.atomic():
+            if pending:
+                BlogPost.objects.filter(pk__in=pending).update(
+                    view_count=F('view_count') + Case(
+                        *[When(pk=post_id, then=Value(count)) for post_id, count in pending.items()],
+                        default=Value(0)
+                    )
+                )
+                # .update() skips the signals; featured and list responses show the counts
+                bump_version(BlogPost)
+            # A failed UPDATE leaves the counts in the cache for the next flush
+            transaction.on_commit(lambda: _release_counts(post_ids, pending, slots, last_slot))
+        return sum(pending.values())
+    finally:
+        cache.delete(FLUSH_LOCK_KEY)
@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from blog.counters import flush_view_counts
+
+class Command(BaseCommand):
+    help = 'Write the view counts accumulated in the cache to the blog posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep flushing at every interval')
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=settings.BLOG_VIEW_COUNT_FLUSH_INTERVAL,
+            help='Seconds between flushes with --loop'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            views = flush_view_counts()
+            self.stdout.write(self.style.SUCCESS(f'Flushed {views} post views'))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -1,7 +1,20 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.utils.text import slugify
 
+# Text search configuration used for post documents and queries
+SEARCH_CONFIG = 'english'
+
+def post_search_vector():
+    """Weighted search document of a post: title, then summary, then content."""
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('summary', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('content', weight='C', config=SEARCH_CONFIG)
+    )
+
 class Category(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True, blank=True)
@@ -51,18 +64,26 @@ class BlogPost(models.Model):
     
     # Analytics
     view_count = models.PositiveIntegerField(default=0)
+
+    # Full-text search document, maintained on save
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['status', '-published_at']),
+            models.Index(fields=['status', '-view_count'], name='blog_post_status_views_idx'),
+            GinIndex(fields=['search_vector'], name='blog_post_search_gin'),
         ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'title', 'summary', 'content'} & set(update_fields):
+            BlogPost.objects.filter(pk=self.pk).update(search_vector=post_search_vector())
 
     def __str__(self):
         return self.title
@@ -78,6 +99,9 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['post', 'is_approved', '-created_at', '-id'], name='blog_comment_post_idx'),
+        ]
 
     def __str__(self):
         return f'Comment by {self.author_name} on {self.post.title}'
@@ -0,0 +1,9 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CommentCursorPagination(CursorPagination):
+    """Keyset pagination for a post's comments, newest first."""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
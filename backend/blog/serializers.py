@@ -1,9 +1,22 @@
 from rest_framework import serializers
 from .models import Category, BlogPost, Comment
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.utils import timezone
 
 User = get_user_model()
 
+# Approved comments embedded in a post's detail response
+COMMENT_PREVIEW_LIMIT = 20
+
+# Columns read by the list serializers, so listings never load the post body
+POST_LIST_FIELDS = [
+    'id', 'title', 'slug', 'summary', 'featured_image', 'status',
+    'created_at', 'published_at', 'view_count',
+    'author__id', 'author__username', 'author__first_name', 'author__last_name',
+    'category__id', 'category__name', 'category__slug', 'category__description',
+]
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -21,6 +34,12 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'author_name', 'author_email', 'content', 'created_at', 'is_approved']
         read_only_fields = ['is_approved']
 
+class CommentSummarySerializer(serializers.ModelSerializer):
+    """Public view of an approved comment"""
+    class Meta:
+        model = Comment
+        fields = ['id', 'author_name', 'content', 'created_at']
+
 class BlogPostListSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
@@ -34,10 +53,47 @@ class BlogPostListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['slug', 'view_count']
 
+def serialize_post_list(queryset):
+    """Same output as BlogPostListSerializer(many=True), built from .values() rows"""
+    posts = []
+    for row in queryset.values(*POST_LIST_FIELDS):
+        posts.append({
+            'id': row['id'],
+            'title': row['title'],
+            'slug': row['slug'],
+            'author': {
+                'id': row['author__id'],
+                'username': row['author__username'],
+                'first_name': row['author__first_name'],
+                'last_name': row['author__last_name'],
+            },
+            'category': {
+                'id': row['category__id'],
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+                'description': row['category__description'],
+            } if row['category__id'] is not None else None,
+            'summary': row['summary'],
+            'featured_image': default_storage.url(row['featured_image']) if row['featured_image'] else None,
+            'status': row['status'],
+            'created_at': timezone.localtime(row['created_at']),
+            'published_at': timezone.localtime(row['published_at']) if row['published_at'] else None,
+            'view_count': row['view_count'],
+        })
+    return posts
+
+class BlogPostSearchSerializer(BlogPostListSerializer):
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(BlogPostListSerializer.Meta):
+        fields = BlogPostListSerializer.Meta.fields + ['rank', 'headline']
+
 class BlogPostDetailSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
+    comment_count = serializers.SerializerMethodField()
     
     class Meta:
         model = BlogPost
@@ -46,10 +102,23 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
             'content', 'summary', 'featured_image', 'status',
             'meta_description', 'meta_keywords',
             'created_at', 'updated_at', 'published_at',
-            'view_count', 'comments'
+            'view_count', 'comment_count', 'comments'
         ]
         read_only_fields = ['slug', 'view_count']
 
+    def get_comments(self, post):
+        # Latest approved comments, prefetched by the view; the rest are paginated
+        comments = getattr(post, 'approved_comments', None)
+        if comments is None:
+            comments = post.comments.filter(is_approved=True)[:COMMENT_PREVIEW_LIMIT]
+        return CommentSummarySerializer(comments, many=True).data
+
+    def get_comment_count(self, post):
+        count = getattr(post, 'comment_count', None)
+        if count is None:
+            count = post.comments.filter(is_approved=True).count()
+        return count
+
     def create(self, validated_data):
         # Set the author to the current user
         validated_data['author'] = self.context['request'].user
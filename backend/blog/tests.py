@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from .counters import DIRTY_SEQUENCE_KEY, FLUSH_LOCK_KEY, flush_view_counts, record_view
+from .models import BlogPost
+
+User = get_user_model()
+
+
+class ViewCountTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', 'author@example.com', 'password')
+        cls.post = BlogPost.objects.create(
+            title='Field report', author=author, content='Report', status='published'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def flush(self):
+        # The counts are released once the UPDATE commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return flush_view_counts()
+
+    def assertViewCount(self, count):
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, count)
+
+    def test_views_are_written_by_the_flush(self):
+        for _ in range(3):
+            record_view(self.post.pk)
+        self.assertViewCount(0)
+        self.assertEqual(self.flush(), 3)
+        self.assertViewCount(3)
+        self.assertEqual(self.flush(), 0)
+
+        record_view(self.post.pk)
+        self.assertEqual(self.flush(), 1)
+        self.assertViewCount(4)
+
+    def test_retrieve_and_revalidation_are_counted(self):
+        url = f'/api/blog/posts/{self.post.slug}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.flush()
+        self.assertViewCount(2)
+
+    def test_views_during_a_flush_are_kept(self):
+        record_view(self.post.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_view_counts(), 1)
+            # Counted after the flush read the counter, before it released it
+            record_view(self.post.pk)
+        self.assertViewCount(1)
+        self.assertEqual(self.flush(), 1)
+        self.assertViewCount(2)
+
+    def test_flush_between_slot_allocation_and_write(self):
+        real_add = cache.add
+        interrupted = []
+
+        def add(key, *args, **kwargs):
+            if key.startswith(f'{DIRTY_SEQUENCE_KEY}:') and not interrupted:
+                # Another process flushes after the viewer allocated its slot
+                interrupted.append(key)
+                self.flush()
+            return real_add(key, *args, **kwargs)
+
+        with mock.patch.object(cache, 'add', side_effect=add):
+            record_view(self.post.pk)
+        self.assertTrue(interrupted)
+        self.assertEqual(self.flush(), 1)
+        self.assertViewCount(1)
+
+        # The post is logged again by later views
+        record_view(self.post.pk)
+        self.assertEqual(self.flush(), 1)
+        self.assertViewCount(2)
+
+    def test_concurrent_flushes_do_not_count_twice(self):
+        record_view(self.post.pk)
+        cache.add(FLUSH_LOCK_KEY, True, 60)
+        self.assertEqual(self.flush(), 0)
+        cache.delete(FLUSH_LOCK_KEY)
+        self.assertEqual(self.flush(), 1)
+        self.assertEqual(self.flush(), 0)
+        self.assertViewCount(1)
@@ -1,15 +1,26 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import Count, F, Prefetch, Q
 from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Category, BlogPost, Comment
+from core.caching import ResponseCacheMixin
+from core.versioning import NotModified
+from .counters import record_view
+from .pagination import CommentCursorPagination
+from .models import SEARCH_CONFIG, Category, BlogPost, Comment
 from .serializers import (
     CategorySerializer,
     BlogPostListSerializer,
+    BlogPostSearchSerializer,
     BlogPostDetailSerializer,
     BlogPostCreateUpdateSerializer,
-    CommentSerializer
+    CommentSerializer,
+    CommentSummarySerializer,
+    COMMENT_PREVIEW_LIMIT,
+    POST_LIST_FIELDS,
+    serialize_post_list
 )
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -18,16 +29,51 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
 
-class BlogPostViewSet(viewsets.ModelViewSet):
+class BlogPostViewSet(ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = BlogPost.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['category', 'status']
     search_fields = ['title', 'content', 'summary']
     ordering_fields = ['created_at', 'published_at', 'view_count']
     lookup_field = 'slug'
+    version_models = [BlogPost, Category]
+    cache_actions = ['list', 'featured', 'recent']
+
+    def initial(self, request, *args, **kwargs):
+        try:
+            super().initial(request, *args, **kwargs)
+        except NotModified:
+            if self.action == 'retrieve':
+                # A revalidated read is still a view, served from the client's cache
+                post_id = BlogPost.objects.filter(
+                    **{self.lookup_field: self.kwargs[self.lookup_field]}
+                ).values_list('pk', flat=True).first()
+                if post_id is not None:
+                    record_view(post_id)
+            raise
+
+    def get_version_models(self):
+        models = super().get_version_models()
+        if self.action in ('retrieve', 'comments'):
+            # The detail view embeds the post's comments
+            models.append(Comment)
+        return models
 
     def get_queryset(self):
         queryset = BlogPost.objects.all()
+        if self.action in ('list', 'featured', 'recent', 'search'):
+            # Listings join author and category and skip the heavy columns
+            queryset = queryset.select_related('author', 'category').only(*POST_LIST_FIELDS)
+        elif self.action == 'retrieve':
+            queryset = queryset.select_related('author', 'category').annotate(
+                comment_count=Count('comments', filter=Q(comments__is_approved=True))
+            ).prefetch_related(Prefetch(
+                'comments',
+                queryset=Comment.objects.filter(is_approved=True).order_by(
+                    '-created_at', '-id'
+                )[:COMMENT_PREVIEW_LIMIT],
+                to_attr='approved_comments'
+            ))
         if self.action == 'list':
             # For list view, only show published posts to non-staff users
             if not self.request.user.is_staff:
@@ -50,9 +96,8 @@ class BlogPostViewSet(viewsets.ModelViewSet):
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Increment view count
-        instance.view_count += 1
-        instance.save()
+        # Counted in the cache and written in batches, so reads stay a SELECT
+        record_view(instance.pk)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
@@ -62,8 +107,7 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         posts = self.get_queryset().filter(
             status='published'
         ).order_by('-view_count')[:5]
-        serializer = BlogPostListSerializer(posts, many=True)
-        return Response(serializer.data)
+        return Response(serialize_post_list(posts))
 
     @action(detail=False, methods=['get'])
     def recent(self, request):
@@ -71,8 +115,43 @@ class BlogPostViewSet(viewsets.ModelViewSet):
         posts = self.get_queryset().filter(
             status='published'
         ).order_by('-published_at')[:5]
-        serializer = BlogPostListSerializer(posts, many=True)
-        return Response(serializer.data)
+        return Response(serialize_post_list(posts))
+
+    @action(detail=True, methods=['get'])
+    def comments(self, request, slug=None):
+        """Approved comments of a post, newest first"""
+        post = self.get_object()
+        comments = Comment.objects.filter(post=post, is_approved=True)
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(comments, request, view=self)
+        serializer = CommentSummarySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search of published posts, best matches first"""
+        terms = request.query_params.get('q', '').strip()
+        if not terms:
+            return Response(
+                {'error': 'q parameter is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        query = SearchQuery(terms, search_type='websearch', config=SEARCH_CONFIG)
+        posts = self.get_queryset().filter(
+            status='published',
+            search_vector=query
+        ).annotate(
+            rank=SearchRank(F('search_vector'), query),
+            headline=SearchHeadline(
+                'content', query, config=SEARCH_CONFIG,
+                start_sel='<mark>', stop_sel='</mark>',
+                max_words=35, min_words=15
+            )
+        ).order_by('-rank', '-published_at')
+        page = self.paginate_queryset(posts)
+        serializer = BlogPostSearchSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
 class CommentViewSet(viewsets.ModelViewSet):
     queryset = Comment.objects.all()
@@ -1,7 +1,7 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
-from django.core.mail import send_mail
 from django.conf import settings
+from core.mail import queue_mail
 from .models import Contact
 from .serializers import ContactSerializer, ContactAdminSerializer
 
@@ -63,14 +63,10 @@ class ContactViewSet(viewsets.ModelViewSet):
         Submitted on: {contact.created_at}
         """
         
-        try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [settings.ADMIN_EMAIL],
-                fail_silently=False,
-            )
-        except Exception as e:
-            # Log the error but don't prevent form submission
-            print(f"Error sending notification email: {str(e)}")
+        # Delivered by the outbox worker, so the submission never waits on SMTP
+        queue_mail(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [settings.ADMIN_EMAIL]
+        )
@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import OutboundEmail
 
-# Register your models here.
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    # Bodies may contain password reset and verification tokens
+    exclude = ('body', 'html_body')
+    # Only the status and due time can be changed, to retry a failed email
+    readonly_fields = ('subject', 'from_email', 'recipients', 'attempts', 'last_error', 'created_at', 'sent_at')
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,135 @@
+"""In-process fan-out of Postgres NOTIFY messages for streaming endpoints.
+
+Writers call ``notify()`` inside their transaction; Postgres delivers the
+message to every worker when it commits. Each worker process runs a single
+``Broadcaster`` per channel, holding one LISTEN connection and handing every
+message to the queues of its connected clients.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.db import connection
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# Messages a slow client may fall behind by before new ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Seconds between keepalive comments on idle event streams
+KEEPALIVE_INTERVAL = 15
+
+
+def notify(channel, payload):
+    """Publish ``payload`` on ``channel`` when the current transaction commits."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [channel, json.dumps(payload, cls=JSONEncoder)])
+
+
+def notify_many(channel, payloads):
+    """Publish every payload on ``channel`` with a single query."""
+    if not payloads:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+            [channel, [json.dumps(payload, cls=JSONEncoder) for payload in payloads]]
+        )
+
+
+def _conninfo():
+    from psycopg.conninfo import make_conninfo
+
+    database = settings.DATABASES['default']
+    return make_conninfo(
+        dbname=database['NAME'],
+        user=database['USER'],
+        password=database['PASSWORD'],
+        host=database['HOST'],
+        port=database['PORT'],
+    )
+
+
+class Broadcaster:
+    """Deliver the messages of one NOTIFY channel to in-process subscribers.
+
+    Subscribers are registered with a predicate; ``subscribers_for`` can be
+    overridden to index them when checking every predicate is too slow.
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.subscribers = {}
+        self.listener = None
+
+    def add(self, queue, predicate, **subscription):
+        self.subscribers[queue] = predicate
+
+    def remove(self, queue):
+        self.subscribers.pop(queue, None)
+
+    def subscribers_for(self, message):
+        return [
+            queue for queue, predicate in self.subscribers.items()
+            if predicate(message)
+        ]
+
+    def publish(self, message):
+        for queue in self.subscribers_for(message):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                pass
+
+    async def listen(self):
+        import psycopg
+        from psycopg import sql
+
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(_conninfo(), autocommit=True)
+                async with conn:
+                    await conn.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+                    async for notification in conn.notifies():
+                        self.publish(json.loads(notification.payload))
+            except psycopg.OperationalError:
+                # Reconnect after a database restart or network failure
+                await asyncio.sleep(1)
+
+    async def subscribe(self, predicate=lambda message: True, **subscription):
+        """Yield matching messages, or None after ``KEEPALIVE_INTERVAL`` idle seconds."""
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.get_running_loop().create_task(self.listen())
+
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.add(queue, predicate, **subscription)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self.remove(queue)
+
+
+def format_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n'
+
+
+def event_stream_response(initial, messages, event, initial_event=None):
+    """Server-Sent Events response: ``initial`` data, then every message.
+
+    Must be served through ASGI so the messages are awaited without holding a
+    worker thread per client.
+    """
+    async def events():
+        yield format_event(initial_event or event, initial)
+        async for message in messages:
+            yield ': keepalive\n\n' if message is None else format_event(event, message)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
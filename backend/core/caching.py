@@ -0,0 +1,145 @@
+"""Response cache for read-heavy API actions.
+
+Entries are keyed by the conditional GET ETag, which already covers the URL,
+the normalized query parameters and the change versions of the models feeding
+the view. The post_save/post_delete signals that bump those versions therefore
+invalidate exactly the responses built from the changed models.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from rest_framework.exceptions import APIException
+from .versioning import ConditionalGetMixin
+
+# Streamed responses larger than this are served but not cached
+MAX_CACHED_STREAM_SIZE = 5 * 1024 * 1024
+
+# Names of every cached endpoint, for the hit/miss report
+CACHED_ENDPOINTS = set()
+
+
+def _counter_key(endpoint, outcome):
+    return f'response_cache:{outcome}:{endpoint}'
+
+
+def _count(endpoint, outcome):
+    key = _counter_key(endpoint, outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    """Hit and miss counters of every cached endpoint."""
+    stats = {}
+    for endpoint in sorted(CACHED_ENDPOINTS):
+        hits = cache.get(_counter_key(endpoint, 'hits'), 0)
+        misses = cache.get(_counter_key(endpoint, 'misses'), 0)
+        stats[endpoint] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else None,
+        }
+    return stats
+
+
+class StreamCapture:
+    """Copy of a streamed body, dropped once it grows past the size limit."""
+    def __init__(self):
+        self.chunks, self.size = [], 0
+
+    def add(self, chunk):
+        if self.chunks is None:
+            return
+        self.size += len(chunk)
+        if self.size <= MAX_CACHED_STREAM_SIZE:
+            self.chunks.append(chunk)
+        else:
+            self.chunks = None
+
+
+class CachedResponse(APIException):
+    """Raised from ``initial`` to short-circuit the view with a cached entry."""
+    def __init__(self, entry):
+        self.entry = entry
+
+
+class ResponseCacheMixin(ConditionalGetMixin):
+    """Cache the rendered responses of ``cache_actions``."""
+    cache_actions = []
+    cache_timeout = settings.RESPONSE_CACHE_TIMEOUT
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for action in cls.cache_actions:
+            CACHED_ENDPOINTS.add(f'{cls.__name__}.{action}')
+
+    def initial(self, request, *args, **kwargs):
+        self.cache_key = None
+        super().initial(request, *args, **kwargs)
+        if not self.etag or getattr(self, 'action', None) not in self.cache_actions:
+            return
+
+        endpoint = f'{self.__class__.__name__}.{self.action}'
+        self.cache_key = f'response_cache:{self.etag.strip(chr(34))}'
+        entry = cache.get(self.cache_key)
+        _count(endpoint, 'misses' if entry is None else 'hits')
+        if entry is not None:
+            raise CachedResponse(entry)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, CachedResponse):
+            # Served from the cache: storing it again would reset its TTL
+            self.cache_key = None
+            return HttpResponse(
+                exc.entry['content'],
+                content_type=exc.entry['content_type'],
+                status=exc.entry['status']
+            )
+        return super().handle_exception(exc)
+
+    def store_response(self, key, content, response):
+        cache.set(key, {
+            'content': content,
+            'content_type': response['Content-Type'],
+            'status': response.status_code,
+        }, self.cache_timeout)
+
+    def cache_streaming_content(self, key, response):
+        capture = StreamCapture()
+        for chunk in response.streaming_content:
+            capture.add(chunk)
+            yield chunk
+        if capture.chunks is not None:
+            self.store_response(key, b''.join(capture.chunks), response)
+
+    async def cache_async_streaming_content(self, key, response):
+        capture = StreamCapture()
+        async for chunk in response.streaming_content:
+            capture.add(chunk)
+            yield chunk
+        if capture.chunks is not None:
+            await sync_to_async(self.store_response)(key, b''.join(capture.chunks), response)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, 'cache_key', None)
+        if not key or response.status_code != 200:
+            return response
+
+        if response.streaming and response.is_async:
+            response.streaming_content = self.cache_async_streaming_content(key, response)
+        elif response.streaming:
+            response.streaming_content = self.cache_streaming_content(key, response)
+        elif isinstance(response, SimpleTemplateResponse) and not response.is_rendered:
+            response.add_post_render_callback(
+                lambda rendered: self.store_response(key, rendered.content, rendered)
+            )
+        else:
+            self.store_response(key, response.content, response)
+        return response
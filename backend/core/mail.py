@@ -0,0 +1,114 @@
+"""Outbox for outgoing email.
+
+Requests only insert an OutboundEmail row. The send_queued_mail worker
+leases pending rows in batches, delivers them over a single SMTP connection
+outside of any transaction and retries failures with exponential backoff.
+Bodies are cleared once they are no longer needed.
+"""
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboundEmail
+
+
+def queue_mail(subject, message, from_email, recipient_list, html_message=None):
+    """Queue an email; same arguments as django.core.mail.send_mail."""
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=list(recipient_list),
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt after ``attempts`` failures."""
+    return settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+
+
+def _record_failure(email, error, now):
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = now + timezone.timedelta(seconds=retry_delay(email.attempts))
+
+
+def claim_batch(batch_size, now):
+    """Lease a batch of due emails to this worker and return them.
+
+    The rows are marked ``sending`` in a short transaction, so no lock is held
+    while talking to SMTP. Rows of a worker that died mid-batch become due
+    again once their lease expires.
+    """
+    lease_expires_at = now + timezone.timedelta(seconds=settings.EMAIL_OUTBOX_LEASE)
+    with transaction.atomic():
+        # Concurrent workers skip the rows another worker is claiming
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True).filter(
+                status__in=['pending', 'sending'],
+                next_attempt_at__lte=now
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        for email in emails:
+            email.status = 'sending'
+            email.attempts += 1
+            email.next_attempt_at = lease_expires_at
+        OutboundEmail.objects.bulk_update(emails, ['status', 'attempts', 'next_attempt_at'])
+    return emails
+
+
+def send_queued_mail(batch_size=None):
+    """Deliver one batch of due emails and return how many were processed."""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    now = timezone.now()
+    emails = claim_batch(batch_size, now)
+    if not emails:
+        return 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            _record_failure(email, e, now)
+    else:
+        try:
+            for email in emails:
+                message = EmailMultiAlternatives(
+                    email.subject,
+                    email.body,
+                    email.from_email,
+                    email.recipients,
+                    connection=connection
+                )
+                if email.html_body:
+                    message.attach_alternative(email.html_body, 'text/html')
+                try:
+                    message.send()
+                except Exception as e:
+                    _record_failure(email, e, now)
+                else:
+                    email.status = 'sent'
+                    email.sent_at = timezone.now()
+                    email.body = email.html_body = ''
+        finally:
+            connection.close()
+
+    OutboundEmail.objects.bulk_update(
+        emails,
+        ['status', 'next_attempt_at', 'last_error', 'sent_at', 'body', 'html_body']
+    )
+    return len(emails)
+
+
+def expire_failed_mail():
+    """Clear the bodies of emails that failed longer ago than the retention window."""
+    cutoff = timezone.now() - timezone.timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+    return OutboundEmail.objects.filter(
+        status='failed',
+        created_at__lt=cutoff
+    ).exclude(body='', html_body='').update(body='', html_body='')
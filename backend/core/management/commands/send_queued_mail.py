@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.mail import expire_failed_mail, send_queued_mail
+
+class Command(BaseCommand):
+    help = 'Deliver queued emails in batches over a reused SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Emails sent per connection')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between polls when the outbox is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = send_queued_mail(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Processed {processed} queued emails')
+                continue
+            expire_failed_mail()
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('No queued emails are due'))
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='outboundemail',
+            name='body',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RemoveIndex(
+            model_name='outboundemail',
+            name='core_outbox_pending_idx',
+        ),
+        migrations.AddIndex(
+            model_name='outboundemail',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'sending'])), fields=['next_attempt_at'], name='core_outbox_due_idx'),
+        ),
+        migrations.RunSQL(
+            "UPDATE core_outboundemail SET body = '', html_body = '' WHERE status = 'sent'",
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,3 +1,88 @@
-from django.test import TestCase
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .mail import expire_failed_mail, queue_mail, send_queued_mail
+from .models import ChangeVersion, OutboundEmail
+from .versioning import bump_version, get_versions
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_OUTBOX_MAX_ATTEMPTS=3,
+    EMAIL_OUTBOX_RETRY_DELAY=60,
+    EMAIL_OUTBOX_LEASE=300,
+    EMAIL_OUTBOX_RETENTION_DAYS=7
+)
+class OutboxTests(TestCase):
+    def queue(self):
+        return queue_mail('Reset your password', 'token 1234', None, ['user@example.com'],
+                          html_message='<p>token 1234</p>')
+
+    def test_sends_queued_mail_and_clears_the_body(self):
+        email = self.queue()
+        self.assertEqual(send_queued_mail(), 1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].body, 'token 1234')
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'sent')
+        self.assertEqual((email.body, email.html_body), ('', ''))
+        self.assertEqual(send_queued_mail(), 0)
+
+    def test_failures_are_retried_with_exponential_backoff(self):
+        email = self.queue()
+        with mock.patch('core.mail.EmailMultiAlternatives.send', side_effect=SMTPException('down')):
+            for attempt, delay in ((1, 60), (2, 120)):
+                before = timezone.now()
+                send_queued_mail()
+                email.refresh_from_db()
+                self.assertEqual((email.status, email.attempts), ('pending', attempt))
+                self.assertEqual(email.last_error, 'down')
+                self.assertGreaterEqual(email.next_attempt_at, before + timezone.timedelta(seconds=delay))
+                # Not due yet
+                self.assertEqual(send_queued_mail(), 0)
+                OutboundEmail.objects.update(next_attempt_at=timezone.now())
+
+            send_queued_mail()
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 3))
+        self.assertEqual(email.body, 'token 1234')
+
+    def test_leased_emails_are_skipped_until_the_lease_expires(self):
+        email = self.queue()
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='sending',
+            next_attempt_at=timezone.now() + timezone.timedelta(minutes=5)
+        )
+        self.assertEqual(send_queued_mail(), 0)
+
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_mail(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_bodies_are_cleared_after_the_retention_window(self):
+        email = self.queue()
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            status='failed',
+            created_at=timezone.now() - timezone.timedelta(days=8)
+        )
+        self.assertEqual(expire_failed_mail(), 1)
+        email.refresh_from_db()
+        self.assertEqual((email.body, email.html_body), ('', ''))
+
+
+class ChangeVersionTests(TestCase):
+    def version(self):
+        return get_versions([ChangeVersion]).get('core.changeversion', (0, None))[0]
+
+    def test_versions_are_bumped_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version(ChangeVersion)
+            self.assertEqual(self.version(), 0)
+        self.assertEqual(self.version(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version(ChangeVersion)
+        self.assertEqual(self.version(), 2)
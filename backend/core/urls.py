@@ -1,7 +1,8 @@
 from django.urls import path
+from . import views
 
 app_name = 'core'
 
 urlpatterns = [
-    # URLs will be added as we create views
+    path('cache-stats/', views.CacheStatsView.as_view(), name='cache-stats'),
 ]
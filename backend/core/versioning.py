@@ -0,0 +1,155 @@
+"""Per-model change versions used for ETag / Last-Modified conditional GETs."""
+import hashlib
+import json
+from functools import partial
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from .models import ChangeVersion
+
+# Models whose saves and deletes invalidate cached representations. Models
+# written on hot paths without ETag'd endpoints of their own, such as
+# donations.Donation, are left out.
+TRACKED_MODELS = [
+    'warmap.Location',
+    'warmap.Event',
+    'warmap.Area',
+    'warmap.Movement',
+    'blog.Category',
+    'blog.BlogPost',
+    'blog.Comment',
+    'donations.DonationCause',
+]
+
+
+def _bump(label):
+    updated = ChangeVersion.objects.filter(label=label).update(
+        version=F('version') + 1,
+        updated_at=timezone.now()
+    )
+    if not updated:
+        try:
+            ChangeVersion.objects.get_or_create(label=label, defaults={'version': 1})
+        except IntegrityError:
+            _bump(label)
+
+
+def bump_version(model):
+    """Record a change to ``model``. Call it after bulk updates that skip signals.
+
+    The bump runs once the current transaction commits, so concurrent writers
+    only contend for the version row briefly instead of until they commit.
+    """
+    transaction.on_commit(partial(_bump, model._meta.label_lower))
+
+
+def get_versions(models):
+    labels = [model._meta.label_lower for model in models]
+    return {
+        label: (version, updated_at)
+        for label, version, updated_at in ChangeVersion.objects.filter(
+            label__in=labels
+        ).values_list('label', 'version', 'updated_at')
+    }
+
+
+def _model_changed(sender, **kwargs):
+    bump_version(sender)
+
+
+def track_changes():
+    for label in TRACKED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_model_changed, sender=model, dispatch_uid=f'change_version_save_{label}')
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=f'change_version_delete_{label}')
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin:
+    """Answer repeated GETs with 304 Not Modified while the data is unchanged.
+
+    The ETag is derived from the request and the change versions of
+    ``version_models``, so a matching ``If-None-Match`` (or a fresh
+    ``If-Modified-Since``) is answered before any query for the data runs.
+
+    Responses that also change with the clock must read it from
+    ``request_time()`` and list their action in ``time_sensitive_actions``,
+    or return what they depend on from ``get_etag_extra()``.
+    """
+    version_models = []
+    # Actions whose results depend on the current time, to the minute
+    time_sensitive_actions = []
+
+    def get_version_models(self):
+        return [
+            apps.get_model(model) if isinstance(model, str) else model
+            for model in self.version_models
+        ]
+
+    def request_time(self):
+        """Current time truncated to the minute, fixed for the whole request."""
+        if getattr(self, '_request_time', None) is None:
+            self._request_time = timezone.now().replace(second=0, microsecond=0)
+        return self._request_time
+
+    def get_etag_extra(self):
+        """Data besides the request and the model versions the response depends on."""
+        if getattr(self, 'action', None) in self.time_sensitive_actions:
+            return self.request_time()
+        return None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        models = self.get_version_models()
+        if request.method not in SAFE_METHODS or not models:
+            return
+
+        versions = get_versions(models)
+        key = json.dumps([
+            request.build_absolute_uri(request.path),
+            sorted(request.query_params.lists()),
+            request.accepted_media_type,
+            bool(request.user and request.user.is_staff),
+            sorted((label, version) for label, (version, _) in versions.items()),
+            self.get_etag_extra(),
+        ], default=str)
+        self.etag = '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+        if versions:
+            self.last_modified = max(updated_at for _, updated_at in versions.values())
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # GET uses the weak comparison, so W/ prefixes are ignored
+            etags = [etag.removeprefix('W/') for etag in parse_etags(if_none_match)]
+            if '*' in etags or self.etag in etags:
+                raise NotModified()
+        elif self.last_modified and self.get_etag_extra() is None:
+            # Last-Modified only reflects model changes, not the clock
+            if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+            if if_modified_since and int(self.last_modified.timestamp()) <= if_modified_since:
+                raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'etag', None) and response.status_code in (200, 304):
+            response['ETag'] = self.etag
+            if self.last_modified:
+                response['Last-Modified'] = http_date(self.last_modified.timestamp())
+        return response
@@ -1,3 +1,12 @@
-from django.shortcuts import render
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .caching import cache_stats
 
-# Create your views here.
+
+class CacheStatsView(APIView):
+    """Hit and miss counters of the cached API endpoints."""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
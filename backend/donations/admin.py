@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DonationCause, Donation
+from .models import DonationCause, Donation, StripeCustomer, StripeEvent
 
 @admin.register(DonationCause)
 class DonationCauseAdmin(admin.ModelAdmin):
@@ -24,3 +24,15 @@ class DonationAdmin(admin.ModelAdmin):
         if obj:  # editing an existing object
             return self.readonly_fields + ('amount', 'currency', 'cause')
         return self.readonly_fields
+
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'type', 'created', 'processed_at', 'attempts')
+    list_filter = ('type', 'processed_at')
+    search_fields = ('event_id',)
+    readonly_fields = ('event_id', 'type', 'payload', 'created', 'received_at', 'processed_at', 'attempts', 'last_error')
+
+@admin.register(StripeCustomer)
+class StripeCustomerAdmin(admin.ModelAdmin):
+    list_display = ('email', 'stripe_customer_id', 'created_at')
+    search_fields = ('email', 'stripe_customer_id')
@@ -0,0 +1,53 @@
+"""Local cache of Stripe customers, so returning donors skip Customer.create."""
+import stripe
+from .models import StripeCustomer
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+def get_or_create_customer(email, name):
+    """Return the Stripe customer id of ``email``, creating the customer once."""
+    email = normalize_email(email)
+    customer_id = StripeCustomer.objects.filter(email=email).values_list(
+        'stripe_customer_id', flat=True
+    ).first()
+    if customer_id:
+        return customer_id
+
+    customer = stripe.Customer.create(email=email, name=name)
+    StripeCustomer.objects.bulk_create([
+        StripeCustomer(email=email, stripe_customer_id=customer.id)
+    ], ignore_conflicts=True)
+    # A concurrent checkout for the same donor may have stored its customer first
+    return StripeCustomer.objects.get(email=email).stripe_customer_id
+
+
+def is_missing_customer(error):
+    """Whether a Stripe error says the given customer does not exist."""
+    return (
+        isinstance(error, stripe.error.InvalidRequestError)
+        and error.code == 'resource_missing'
+        and error.param == 'customer'
+    )
+
+
+def forget_customer(email, customer_id):
+    """Drop a cached customer that was deleted in Stripe."""
+    StripeCustomer.objects.filter(
+        email=normalize_email(email),
+        stripe_customer_id=customer_id
+    ).delete()
+
+
+def remember_customers(donations):
+    """Cache the customers of donations recorded from Stripe."""
+    StripeCustomer.objects.bulk_create([
+        StripeCustomer(
+            email=normalize_email(donation.donor_email),
+            stripe_customer_id=donation.stripe_customer_id
+        )
+        for donation in donations
+        if donation.donor_email and donation.stripe_customer_id
+    ], ignore_conflicts=True)
@@ -0,0 +1,67 @@
+"""Live donation progress, pushed to /api/donations/causes/{id}/stream/."""
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+from core.broadcast import Broadcaster, notify
+
+PROGRESS_CHANNEL = 'donation_progress'
+
+# Donations listed in one progress message
+MAX_ANNOUNCED_DONATIONS = 10
+
+# Characters of a donor's name and message shown in the feed
+MAX_ANNOUNCED_TEXT = 140
+
+# NOTIFY rejects payloads of 8000 bytes or more, which would abort the
+# transaction recording the donation; older donations are dropped to fit
+MAX_PAYLOAD_SIZE = 7500
+
+progress_broadcaster = Broadcaster(PROGRESS_CHANNEL)
+
+
+def cause_progress(cause):
+    return {
+        'cause': cause.pk,
+        'current_amount': str(cause.current_amount),
+        'target_amount': str(cause.target_amount),
+        'progress_percentage': float(cause.progress_percentage),
+    }
+
+
+def truncate(text):
+    if len(text) <= MAX_ANNOUNCED_TEXT:
+        return text
+    return text[:MAX_ANNOUNCED_TEXT - 1] + '…'
+
+
+def payload_size(message):
+    return len(json.dumps(message, cls=JSONEncoder).encode())
+
+
+def announce_donations(donations):
+    """Publish the new totals of the causes of newly completed ``donations``.
+
+    Call it inside the transaction that updated the totals.
+    """
+    from .models import DonationCause
+
+    by_cause = {}
+    for donation in donations:
+        if donation.cause_id:
+            by_cause.setdefault(donation.cause_id, []).append(donation)
+
+    for cause in DonationCause.objects.filter(pk__in=by_cause):
+        message = cause_progress(cause)
+        message['donations'] = [
+            {
+                'donor_name': truncate(donation.donor_name),
+                'amount': str(donation.amount),
+                'currency': donation.currency,
+                'message': truncate(donation.message),
+            }
+            for donation in by_cause[cause.pk]
+            if not donation.is_anonymous
+        ][-MAX_ANNOUNCED_DONATIONS:]
+        while message['donations'] and payload_size(message) > MAX_PAYLOAD_SIZE:
+            message['donations'].pop(0)
+        notify(PROGRESS_CHANNEL, message)
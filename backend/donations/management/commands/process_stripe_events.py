@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from donations.stripe_events import process_stripe_events
+
+class Command(BaseCommand):
+    help = 'Apply stored Stripe webhook events to donations in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events applied per transaction')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events')
+        parser.add_argument('--interval', type=float, default=2, help='Seconds between polls when no events are pending')
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_stripe_events(options['batch_size'])
+            if processed:
+                self.stdout.write(f'Processed {processed} Stripe events')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('No Stripe events are pending'))
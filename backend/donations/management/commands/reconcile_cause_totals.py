@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Sum
+from core.versioning import bump_version
+from donations.models import Donation, DonationCause
+
+class Command(BaseCommand):
+    help = 'Recompute every cause total from its completed donations and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without correcting it')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Lock the causes first, so donations completing meanwhile add to
+            # the corrected totals instead of being overwritten
+            causes = list(DonationCause.objects.select_for_update().order_by('pk'))
+            totals = dict(
+                Donation.objects.filter(
+                    status='completed',
+                    cause__isnull=False
+                ).values('cause_id').annotate(
+                    total=Sum('amount')
+                ).values_list('cause_id', 'total')
+            )
+
+            drifted = []
+            for cause in causes:
+                total = totals.get(cause.pk) or 0
+                if cause.current_amount != total:
+                    self.stdout.write(
+                        f'{cause.title}: recorded {cause.current_amount}, '
+                        f'donations {total}, drift {cause.current_amount - total}'
+                    )
+                    cause.current_amount = total
+                    drifted.append(cause)
+
+            if drifted and not options['dry_run']:
+                DonationCause.objects.bulk_update(drifted, ['current_amount'])
+                bump_version(DonationCause)
+
+        verb = 'Found' if options['dry_run'] else 'Corrected'
+        self.stdout.write(self.style.SUCCESS(f'{verb} drift in {len(drifted)} of {len(causes)} causes'))
@@ -0,0 +1,57 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def clear_blank_payment_intents(apps, schema_editor):
+    Donation = apps.get_model('donations', 'Donation')
+    Donation.objects.filter(stripe_payment_intent_id='').update(stripe_payment_intent_id=None)
+    # Webhook and confirm_payment could both record the same payment; keep the
+    # first donation's reference so the column can become unique
+    duplicates = Donation.objects.exclude(
+        stripe_payment_intent_id=None
+    ).values('stripe_payment_intent_id').annotate(
+        count=Count('id'), first=Min('id')
+    ).filter(count__gt=1)
+    for duplicate in duplicates:
+        Donation.objects.filter(
+            stripe_payment_intent_id=duplicate['stripe_payment_intent_id']
+        ).exclude(pk=duplicate['first']).update(stripe_payment_intent_id=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='donation',
+            name='stripe_payment_intent_id',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RunPython(clear_blank_payment_intents, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='donation',
+            name='stripe_payment_intent_id',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='StripeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255, unique=True)),
+                ('type', models.CharField(max_length=100)),
+                ('payload', models.JSONField()),
+                ('created', models.DateTimeField()),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-created'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['created'], name='donations_event_pending_idx')],
+            },
+        ),
+    ]
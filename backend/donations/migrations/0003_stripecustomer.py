@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def populate_customers(apps, schema_editor):
+    Donation = apps.get_model('donations', 'Donation')
+    StripeCustomer = apps.get_model('donations', 'StripeCustomer')
+    # Latest customer of each donor email
+    customers = {}
+    donations = Donation.objects.exclude(stripe_customer_id='').order_by('-created_at').values_list(
+        'donor_email', 'stripe_customer_id'
+    )
+    for email, customer_id in donations.iterator():
+        customers.setdefault(email.strip().lower(), customer_id)
+    StripeCustomer.objects.bulk_create([
+        StripeCustomer(email=email, stripe_customer_id=customer_id)
+        for email, customer_id in customers.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('donations', '0002_stripe_event_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeCustomer',
+            fields=[
+                ('email', models.EmailField(max_length=254, primary_key=True, serialize=False)),
+                ('stripe_customer_id', models.CharField(max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(populate_customers, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,52 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
 from django.core.validators import MinValueValidator
 from django.utils.translation import gettext_lazy as _
+from core.versioning import bump_version
+
+# Statuses a donation may move to from each status. Refunded is terminal, so
+# a replayed success cannot count a refunded donation again.
+STATUS_TRANSITIONS = {
+    'pending': {'completed', 'failed'},
+    # A failed attempt retried successfully
+    'failed': {'completed'},
+    'completed': {'refunded'},
+    'refunded': set(),
+}
+
+def can_transition(before, after):
+    """Whether a donation in status ``before`` (None if new) may move to ``after``."""
+    return before is None or before == after or after in STATUS_TRANSITIONS[before]
+
+def counted_amount(status, cause_id, amount):
+    """Amount a donation contributes to its cause's total."""
+    return (cause_id, amount) if status == 'completed' and cause_id else (None, 0)
+
+def apply_cause_totals(changes):
+    """Adjust cause totals for (before, after) donation states.
+
+    Each state is a (status, cause_id, amount) tuple, or None for a donation
+    that did not exist. Runs one UPDATE per affected cause, in id order so
+    concurrent batches lock cause rows consistently.
+    """
+    deltas = defaultdict(Decimal)
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state:
+                cause_id, amount = counted_amount(*state)
+                if cause_id:
+                    deltas[cause_id] += sign * amount
+    deltas = {cause_id: delta for cause_id, delta in deltas.items() if delta}
+    for cause_id in sorted(deltas):
+        DonationCause.objects.filter(pk=cause_id).update(
+            current_amount=models.F('current_amount') + deltas[cause_id]
+        )
+    if deltas:
+        # .update() skips the signals that bump the change version
+        bump_version(DonationCause)
 
 class DonationCause(models.Model):
     """Model for different donation causes/campaigns"""
@@ -72,7 +118,8 @@ class Donation(models.Model):
         choices=STATUS_CHOICES,
         default='pending'
     )
-    stripe_payment_intent_id = models.CharField(max_length=100, blank=True)
+    # NULL for donations without a payment intent; upserts from Stripe conflict on it
+    stripe_payment_intent_id = models.CharField(max_length=100, null=True, blank=True, unique=True)
     stripe_customer_id = models.CharField(max_length=100, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -83,9 +130,63 @@ class Donation(models.Model):
     def __str__(self):
         return f"{self.donor_name} - {self.amount} {self.currency}"
 
+    def check_transition(self, before_status):
+        if not can_transition(before_status, self.status):
+            raise ValidationError({
+                'status': f'A {before_status} donation cannot become {self.status}.'
+            })
+
+    def clean(self):
+        super().clean()
+        if self.pk:
+            self.check_transition(
+                Donation.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+            )
+
     def save(self, *args, **kwargs):
-        # Update cause's current amount if donation is completed
-        if self.status == 'completed' and self.cause:
-            self.cause.current_amount = models.F('current_amount') + self.amount
-            self.cause.save()
-        super().save(*args, **kwargs)
+        # Totals change once per status transition, not on every save
+        with transaction.atomic():
+            before = None
+            if self.pk:
+                before = Donation.objects.select_for_update().filter(pk=self.pk).values_list(
+                    'status', 'cause_id', 'amount'
+                ).first()
+            self.check_transition(before[0] if before else None)
+            super().save(*args, **kwargs)
+            apply_cause_totals([(before, (self.status, self.cause_id, self.amount))])
+            if self.status == 'completed' and (not before or before[0] != 'completed'):
+                from .live import announce_donations
+                announce_donations([self])
+
+class StripeEvent(models.Model):
+    """Stripe webhook event, stored on receipt and applied by process_stripe_events"""
+    event_id = models.CharField(max_length=255, unique=True)
+    type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    created = models.DateTimeField()
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['created'],
+                condition=models.Q(processed_at__isnull=True),
+                name='donations_event_pending_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.type} ({self.event_id})"
+
+class StripeCustomer(models.Model):
+    """Stripe customer of each donor, keyed by normalized email"""
+    email = models.EmailField(primary_key=True)
+    stripe_customer_id = models.CharField(max_length=100)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.email} ({self.stripe_customer_id})"
@@ -0,0 +1,181 @@
+"""Apply Stripe webhook events recorded by DonationViewSet.webhook.
+
+The webhook only stores the verified event. process_stripe_events claims
+pending events in batches and upserts their payment intents into Donation
+on stripe_payment_intent_id, so replayed events and a concurrent
+confirm_payment never create a second donation.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+from .customers import remember_customers
+from .live import announce_donations
+from .models import Donation, DonationCause, StripeEvent, apply_cause_totals, can_transition
+
+logger = logging.getLogger(__name__)
+
+# Donation status set by each handled event type
+PAYMENT_INTENT_STATUSES = {
+    'payment_intent.succeeded': 'completed',
+    'payment_intent.payment_failed': 'failed',
+}
+
+# Events failing this many times are left for manual inspection
+MAX_EVENT_ATTEMPTS = 5
+
+
+class UnknownCause(Exception):
+    """A payment intent names a donation cause that does not exist.
+
+    Retrying cannot help, so the event is parked at once.
+    """
+
+
+def donation_from_intent(intent, status):
+    metadata = intent.get('metadata') or {}
+    return Donation(
+        stripe_payment_intent_id=intent['id'],
+        cause_id=metadata.get('cause_id') or None,
+        amount=Decimal(intent['amount']) / 100,  # Convert from cents
+        currency=intent['currency'].upper(),
+        donor_name=metadata.get('donor_name', ''),
+        donor_email=metadata.get('donor_email', ''),
+        is_anonymous=str(metadata.get('is_anonymous', '')).lower() == 'true',
+        status=status,
+        stripe_customer_id=intent.get('customer') or '',
+    )
+
+
+def lock_payment_intents(intent_ids):
+    """Serialize transactions applying the same payment intents.
+
+    Row locks cannot cover a donation that does not exist yet, so
+    confirm_payment and the webhook worker would both see a first
+    ``completed`` as new and count it twice. Transaction-level advisory locks
+    are taken in key order, so overlapping batches cannot deadlock.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(key) FROM ('
+            '  SELECT DISTINCT hashtext(id) AS key FROM unnest(%s::text[]) AS id ORDER BY key'
+            ') AS keys',
+            [list(intent_ids)]
+        )
+
+
+def apply_payment_intents(intents):
+    """Upsert donations for (payment intent, status) pairs.
+
+    Must run inside a transaction, which holds the intents' locks until it
+    commits. Cause totals change once per status transition, in one UPDATE
+    per cause for the whole batch.
+    """
+    intents = list(intents)
+    lock_payment_intents([intent['id'] for intent, _ in intents])
+    existing = {
+        row['stripe_payment_intent_id']: row
+        for row in Donation.objects.select_for_update().filter(
+            stripe_payment_intent_id__in=[intent['id'] for intent, _ in intents]
+        ).values('stripe_payment_intent_id', 'status', 'cause_id', 'amount')
+    }
+
+    # Only new donations take the cause from the metadata
+    new_donations = [
+        donation_from_intent(intent, status)
+        for intent, status in intents if intent['id'] not in existing
+    ]
+    cause_ids = {
+        str(pk) for pk in DonationCause.objects.filter(pk__in=[
+            donation.cause_id for donation in new_donations
+            if str(donation.cause_id or '').isdigit()
+        ]).values_list('pk', flat=True)
+    }
+    for donation in new_donations:
+        if donation.cause_id and str(donation.cause_id) not in cause_ids:
+            raise UnknownCause(
+                f'Payment intent {donation.stripe_payment_intent_id} names cause '
+                f'{donation.cause_id}, which does not exist'
+            )
+
+    donations, changes, completed = [], [], []
+    for intent, status in intents:
+        donation = donation_from_intent(intent, status)
+        previous = existing.get(donation.stripe_payment_intent_id)
+        if previous and not can_transition(previous['status'], status):
+            # A late failure of an attempt retried successfully, or a
+            # replayed success of a refunded donation
+            continue
+        if previous:
+            # The upsert keeps the stored cause and amount
+            before = (previous['status'], previous['cause_id'], previous['amount'])
+            changes.append((before, (status, previous['cause_id'], previous['amount'])))
+        else:
+            changes.append((None, (status, donation.cause_id, donation.amount)))
+        if status == 'completed' and (not previous or previous['status'] != 'completed'):
+            completed.append(donation)
+        donations.append(donation)
+
+    if not donations:
+        return
+    Donation.objects.bulk_create(
+        donations,
+        update_conflicts=True,
+        unique_fields=['stripe_payment_intent_id'],
+        update_fields=['status', 'stripe_customer_id', 'updated_at']
+    )
+    remember_customers(donations)
+    apply_cause_totals(changes)
+    announce_donations(completed)
+
+
+def apply_events(events):
+    # Last event per payment intent wins; events are ordered by creation
+    intents = {}
+    for event in events:
+        status = PAYMENT_INTENT_STATUSES.get(event.type)
+        if status:
+            intent = event.payload['data']['object']
+            intents[intent['id']] = (intent, status)
+    apply_payment_intents(intents.values())
+
+
+def process_stripe_events(batch_size=100):
+    """Apply one batch of pending events and return how many were claimed."""
+    with transaction.atomic():
+        events = list(
+            StripeEvent.objects.select_for_update(skip_locked=True).filter(
+                processed_at__isnull=True,
+                attempts__lt=MAX_EVENT_ATTEMPTS
+            ).order_by('created')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        try:
+            with transaction.atomic():
+                apply_events(events)
+            applied = events
+        except Exception:
+            # Isolate the events that cannot be applied
+            applied = []
+            for event in events:
+                try:
+                    with transaction.atomic():
+                        apply_events([event])
+                    applied.append(event)
+                except UnknownCause as e:
+                    logger.warning('Parking Stripe event %s: %s', event.event_id, e)
+                    event.attempts = MAX_EVENT_ATTEMPTS
+                    event.last_error = str(e)
+                    event.save(update_fields=['attempts', 'last_error'])
+                except Exception as e:
+                    event.attempts += 1
+                    event.last_error = str(e)
+                    event.save(update_fields=['attempts', 'last_error'])
+
+        StripeEvent.objects.filter(pk__in=[event.pk for event in applied]).update(
+            processed_at=timezone.now()
+        )
+    return len(events)
@@ -0,0 +1,252 @@
+import json
+import threading
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+import stripe
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APITestCase
+from .live import MAX_ANNOUNCED_DONATIONS, MAX_PAYLOAD_SIZE, announce_donations, payload_size
+from .models import Donation, DonationCause, StripeCustomer, StripeEvent
+from .stripe_events import MAX_EVENT_ATTEMPTS, apply_payment_intents, process_stripe_events
+
+User = get_user_model()
+
+
+def payment_intent(cause, intent_id='pi_1', amount=2500):
+    return stripe.PaymentIntent.construct_from({
+        'id': intent_id,
+        'object': 'payment_intent',
+        'amount': amount,
+        'currency': 'usd',
+        'status': 'succeeded',
+        'customer': 'cus_1',
+        'metadata': {
+            'cause_id': str(cause.pk),
+            'donor_name': 'Ada',
+            'donor_email': 'ada@example.com',
+            'is_anonymous': 'false',
+        },
+    }, 'sk_test')
+
+
+class StripeWebhookTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cause = DonationCause.objects.create(
+            title='Water', description='Wells', target_amount=1000
+        )
+
+    def deliver(self, event_id, event_type, intent):
+        body = {
+            'id': event_id,
+            'type': event_type,
+            'created': 1700000000,
+            'data': {'object': intent},
+        }
+        event = SimpleNamespace(id=event_id, type=event_type, created=body['created'])
+        with mock.patch('donations.views.stripe.Webhook.construct_event', return_value=event):
+            response = self.client.post(
+                '/api/donations/webhook/',
+                data=json.dumps(body),
+                content_type='application/json',
+                HTTP_STRIPE_SIGNATURE='t=1,v1=signature'
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def assertCountedOnce(self):
+        self.cause.refresh_from_db()
+        self.assertEqual(self.cause.current_amount, Decimal('25.00'))
+        self.assertEqual(Donation.objects.get().status, 'completed')
+
+    def test_webhook_only_records_the_event(self):
+        self.deliver('evt_1', 'payment_intent.succeeded', payment_intent(self.cause))
+        self.assertEqual(StripeEvent.objects.count(), 1)
+        self.assertFalse(Donation.objects.exists())
+
+    def test_duplicate_deliveries_are_counted_once(self):
+        intent = payment_intent(self.cause)
+        self.deliver('evt_1', 'payment_intent.succeeded', intent)
+        self.deliver('evt_1', 'payment_intent.succeeded', intent)
+        self.assertEqual(process_stripe_events(), 1)
+        # A different event for the same intent changes nothing
+        self.deliver('evt_2', 'payment_intent.succeeded', intent)
+        self.assertEqual(process_stripe_events(), 1)
+
+        self.assertCountedOnce()
+        self.assertFalse(StripeEvent.objects.filter(processed_at__isnull=True).exists())
+
+    def test_late_failure_does_not_undo_a_completed_payment(self):
+        intent = payment_intent(self.cause)
+        self.deliver('evt_1', 'payment_intent.succeeded', intent)
+        process_stripe_events()
+        self.deliver('evt_2', 'payment_intent.payment_failed', intent)
+        process_stripe_events()
+        self.assertCountedOnce()
+
+    def test_unknown_cause_parks_the_event_at_once(self):
+        self.deliver('evt_1', 'payment_intent.succeeded',
+                     payment_intent(SimpleNamespace(pk=999999), intent_id='pi_deleted'))
+        self.deliver('evt_2', 'payment_intent.succeeded', payment_intent(self.cause))
+        with self.assertLogs('donations.stripe_events', 'WARNING') as logs:
+            process_stripe_events()
+        self.assertIn('999999', logs.output[0])
+
+        parked = StripeEvent.objects.get(event_id='evt_1')
+        self.assertEqual(parked.attempts, MAX_EVENT_ATTEMPTS)
+        self.assertIn('999999', parked.last_error)
+        self.assertIsNone(parked.processed_at)
+        self.assertCountedOnce()
+        self.assertEqual(process_stripe_events(), 0)
+
+    def test_confirm_payment_and_webhook_are_counted_once(self):
+        intent = payment_intent(self.cause)
+        self.client.force_authenticate(User.objects.create_user('ada', 'ada@example.com', 'password'))
+        with mock.patch('donations.views.stripe.PaymentIntent.retrieve', return_value=intent):
+            response = self.client.post('/api/donations/donations/confirm_payment/', {
+                'paymentIntentId': intent['id']
+            })
+        self.assertEqual(response.status_code, 200)
+
+        self.deliver('evt_1', 'payment_intent.succeeded', intent)
+        process_stripe_events()
+        self.assertCountedOnce()
+
+
+class ConcurrentPaymentIntentTests(TransactionTestCase):
+    def test_concurrent_first_completions_are_counted_once(self):
+        cause = DonationCause.objects.create(title='Water', description='Wells', target_amount=1000)
+        intent = payment_intent(cause)
+        barrier = threading.Barrier(2)
+        errors = []
+
+        def confirm():
+            try:
+                barrier.wait()
+                with transaction.atomic():
+                    apply_payment_intents([(intent, 'completed')])
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=confirm) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        cause.refresh_from_db()
+        self.assertEqual(cause.current_amount, Decimal('25.00'))
+        self.assertEqual(Donation.objects.count(), 1)
+
+
+class PaymentIntentCustomerTests(APITestCase):
+    def test_customer_deleted_in_stripe_is_replaced(self):
+        cause = DonationCause.objects.create(title='Water', description='Wells', target_amount=1000)
+        StripeCustomer.objects.create(email='ada@example.com', stripe_customer_id='cus_deleted')
+        self.client.force_authenticate(User.objects.create_user('ada', 'ada@example.com', 'password'))
+
+        def create_intent(customer, **kwargs):
+            if customer == 'cus_deleted':
+                raise stripe.error.InvalidRequestError(
+                    'No such customer', 'customer', code='resource_missing'
+                )
+            return SimpleNamespace(id='pi_1', client_secret='secret')
+
+        with mock.patch('donations.views.stripe.PaymentIntent.create', side_effect=create_intent), \
+                mock.patch('donations.customers.stripe.Customer.create',
+                           return_value=SimpleNamespace(id='cus_new')):
+            response = self.client.post('/api/donations/donations/create_payment_intent/', {
+                'amount': '25',
+                'currency': 'usd',
+                'cause': cause.pk,
+                'donor_name': 'Ada',
+                'donor_email': 'Ada@example.com',
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['paymentIntentId'], 'pi_1')
+        self.assertEqual(StripeCustomer.objects.get().stripe_customer_id, 'cus_new')
+
+
+class DonationAnnouncementTests(APITestCase):
+    def test_long_messages_fit_in_a_notify_payload(self):
+        cause = DonationCause.objects.create(title='Water', description='Wells', target_amount=1000)
+        donations = [
+            Donation(cause=cause, amount=5, donor_name='D' * 200, donor_email='d@example.com',
+                     message='M' * 20000, status='completed')
+            for _ in range(MAX_ANNOUNCED_DONATIONS)
+        ]
+        with mock.patch('donations.live.notify') as notify:
+            announce_donations(donations)
+        message = notify.call_args.args[1]
+        self.assertLessEqual(payload_size(message), MAX_PAYLOAD_SIZE)
+        self.assertTrue(message['donations'])
+
+        # Sent through Postgres, which rejects payloads of 8000 bytes or more
+        Donation.objects.create(cause=cause, amount=5, donor_name='Ada', donor_email='ada@example.com',
+                                message='M' * 20000, status='completed')
+        cause.refresh_from_db()
+        self.assertEqual(cause.current_amount, Decimal('5.00'))
+
+
+class DonationStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cause = DonationCause.objects.create(title='Water', description='Wells', target_amount=1000)
+
+    def donation(self, status='pending'):
+        return Donation.objects.create(
+            cause=self.cause, amount=25, donor_name='Ada', donor_email='ada@example.com',
+            status=status, stripe_payment_intent_id='pi_1'
+        )
+
+    def assertTotal(self, amount):
+        self.cause.refresh_from_db()
+        self.assertEqual(self.cause.current_amount, Decimal(amount))
+
+    def test_pending_to_completed_counts_the_amount(self):
+        donation = self.donation()
+        self.assertTotal('0.00')
+        donation.status = 'completed'
+        donation.save()
+        self.assertTotal('25.00')
+        # Saving again is not a transition
+        donation.save()
+        self.assertTotal('25.00')
+
+    def test_completed_to_refunded_removes_the_amount(self):
+        donation = self.donation('completed')
+        donation.status = 'refunded'
+        donation.save()
+        self.assertTotal('0.00')
+
+    def test_refunded_is_terminal(self):
+        donation = self.donation('completed')
+        donation.status = 'refunded'
+        donation.save()
+        donation.status = 'completed'
+        with self.assertRaises(ValidationError):
+            donation.full_clean()
+        with self.assertRaises(ValidationError):
+            donation.save()
+        self.assertTotal('0.00')
+
+    def test_replayed_events_do_not_count_twice(self):
+        self.donation()
+        apply_payment_intents([(payment_intent(self.cause), 'completed')])
+        apply_payment_intents([(payment_intent(self.cause), 'completed')])
+        self.assertTotal('25.00')
+
+        donation = Donation.objects.get()
+        donation.status = 'refunded'
+        donation.save()
+        apply_payment_intents([(payment_intent(self.cause), 'completed')])
+        self.assertTotal('0.00')
+        self.assertEqual(Donation.objects.get().status, 'refunded')
@@ -1,22 +1,42 @@
+import json
+from datetime import datetime, timezone as dt_timezone
+
 import stripe
 from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import DonationCause, Donation
+from core.broadcast import event_stream_response
+from core.caching import ResponseCacheMixin
+from .models import DonationCause, Donation, StripeEvent
 from .serializers import (
     DonationCauseSerializer,
     DonationSerializer,
     DonationCreateSerializer
 )
+from .customers import forget_customer, get_or_create_customer, is_missing_customer
+from .live import cause_progress, progress_broadcaster
+from .stripe_events import UnknownCause, apply_payment_intents
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
+# One pooled HTTP session per thread, reused for every Stripe call
+stripe.default_http_client = stripe.http_client.RequestsClient(timeout=settings.STRIPE_TIMEOUT)
 
-class DonationCauseViewSet(viewsets.ModelViewSet):
+class DonationCauseViewSet(ResponseCacheMixin, viewsets.ModelViewSet):
     queryset = DonationCause.objects.all()
     serializer_class = DonationCauseSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    version_models = [DonationCause]
+    cache_actions = ['list']
+
+    def get_version_models(self):
+        if self.action in ('stream', 'donations'):
+            # Event streams are never answered with 304, and donations are
+            # not tracked since every payment writes them
+            return []
+        return super().get_version_models()
 
     def get_queryset(self):
         queryset = DonationCause.objects.all()
@@ -37,6 +57,15 @@ class DonationCauseViewSet(viewsets.ModelViewSet):
         serializer = DonationSerializer(donations, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def stream(self, request, pk=None):
+        """Server-Sent Events with the cause's progress after every completed donation"""
+        cause = self.get_object()
+        messages = progress_broadcaster.subscribe(
+            lambda message: message['cause'] == cause.pk
+        )
+        return event_stream_response(cause_progress(cause), messages, 'progress')
+
 class DonationViewSet(viewsets.ModelViewSet):
     queryset = Donation.objects.all()
     serializer_class = DonationSerializer
@@ -55,24 +84,30 @@ class DonationViewSet(viewsets.ModelViewSet):
             amount = int(float(data['amount']) * 100)  # Convert to cents
             currency = data['currency'].lower()
 
-            # Create or retrieve Stripe customer
-            customer = stripe.Customer.create(
-                email=data['donor_email'],
-                name=data['donor_name']
-            )
+            def create_intent(customer_id):
+                return stripe.PaymentIntent.create(
+                    amount=amount,
+                    currency=currency,
+                    customer=customer_id,
+                    metadata={
+                        'cause_id': data['cause'],
+                        'donor_name': data['donor_name'],
+                        'donor_email': data['donor_email'],
+                        'is_anonymous': data.get('is_anonymous', False)
+                    }
+                )
 
-            # Create PaymentIntent
-            intent = stripe.PaymentIntent.create(
-                amount=amount,
-                currency=currency,
-                customer=customer.id,
-                metadata={
-                    'cause_id': data['cause'],
-                    'donor_name': data['donor_name'],
-                    'donor_email': data['donor_email'],
-                    'is_anonymous': data.get('is_anonymous', False)
-                }
-            )
+            # Returning donors reuse their cached customer
+            customer_id = get_or_create_customer(data['donor_email'], data['donor_name'])
+            try:
+                intent = create_intent(customer_id)
+            except stripe.error.InvalidRequestError as e:
+                if not is_missing_customer(e):
+                    raise
+                # Deleted in Stripe since it was cached
+                forget_customer(data['donor_email'], customer_id)
+                customer_id = get_or_create_customer(data['donor_email'], data['donor_name'])
+                intent = create_intent(customer_id)
 
             return Response({
                 'clientSecret': intent.client_secret,
@@ -89,25 +124,30 @@ class DonationViewSet(viewsets.ModelViewSet):
     def confirm_payment(self, request):
         """Confirm a successful payment and update donation status"""
         payment_intent_id = request.data.get('paymentIntentId')
-        
+        if not payment_intent_id:
+            return Response(
+                {'error': 'paymentIntentId is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Usually already recorded by the webhook worker
+        donation = Donation.objects.filter(
+            stripe_payment_intent_id=payment_intent_id,
+            status='completed'
+        ).first()
+        if donation:
+            return Response(DonationSerializer(donation).data)
+
         try:
             # Retrieve the PaymentIntent
             intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             
             if intent.status == 'succeeded':
-                # Create donation record
-                donation = Donation.objects.create(
-                    cause_id=intent.metadata['cause_id'],
-                    amount=intent.amount / 100,  # Convert from cents
-                    currency=intent.currency.upper(),
-                    donor_name=intent.metadata['donor_name'],
-                    donor_email=intent.metadata['donor_email'],
-                    is_anonymous=intent.metadata['is_anonymous'] == 'true',
-                    status='completed',
-                    stripe_payment_intent_id=payment_intent_id,
-                    stripe_customer_id=intent.customer
-                )
-                
+                # Same upsert as the webhook, so the payment is counted once
+                with transaction.atomic():
+                    apply_payment_intents([(intent, 'completed')])
+                donation = Donation.objects.get(stripe_payment_intent_id=payment_intent_id)
+
                 serializer = DonationSerializer(donation)
                 return Response(serializer.data)
             
@@ -116,15 +156,20 @@ class DonationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        except stripe.error.StripeError as e:
+        except (stripe.error.StripeError, UnknownCause) as e:
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    @action(detail=False, methods=['post'])
+    @action(
+        detail=False,
+        methods=['post'],
+        permission_classes=[permissions.AllowAny],
+        authentication_classes=[]
+    )
     def webhook(self, request):
-        """Handle Stripe webhooks"""
+        """Record Stripe webhooks; process_stripe_events applies them"""
         payload = request.body
         sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
 
@@ -133,20 +178,15 @@ class DonationViewSet(viewsets.ModelViewSet):
                 payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
             )
 
-            # Handle specific events
-            if event.type == 'payment_intent.succeeded':
-                payment_intent = event.data.object
-                # Update donation status if needed
-                Donation.objects.filter(
-                    stripe_payment_intent_id=payment_intent.id
-                ).update(status='completed')
-
-            elif event.type == 'payment_intent.payment_failed':
-                payment_intent = event.data.object
-                # Update donation status
-                Donation.objects.filter(
-                    stripe_payment_intent_id=payment_intent.id
-                ).update(status='failed')
+            # Stripe retries deliveries; the event id makes them no-ops
+            StripeEvent.objects.bulk_create([
+                StripeEvent(
+                    event_id=event.id,
+                    type=event.type,
+                    payload=json.loads(payload),
+                    created=datetime.fromtimestamp(event.created, tz=dt_timezone.utc)
+                )
+            ], ignore_conflicts=True)
 
             return Response({'status': 'success'})
 
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.gis import admin as gis_admin
-from .models import Location, Event, Area, AreaHistory, Movement
+from .models import Location, Event, Area, AreaHistory, AreaCurrentStatus, AreaDailyStats, Movement
 from django.contrib.gis.db import models
 from django.contrib.gis.geos import Point
 
@@ -50,6 +50,34 @@ class AreaHistoryAdmin(gis_admin.GISModelAdmin):
     default_lat = -1.5207  # Default latitude (around DRC)
     default_zoom = 6
 
+@admin.register(AreaCurrentStatus)
+class AreaCurrentStatusAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'date', 'population', 'strategic_value', 'updated_at')
+    list_filter = ('status', 'strategic_value')
+    search_fields = ('name',)
+
+    # Maintained from Area by signals; an edit here would desync it from history
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(AreaDailyStats)
+class AreaDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('date', 'total_zones', 'total_population', 'computed_at')
+    date_hierarchy = 'date'
+
+    # Computed from Area; deleting a rollup only makes it recompute
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 @admin.register(Movement)
 class MovementAdmin(gis_admin.GISModelAdmin):
     list_display = ('name', 'movement_type', 'start_date', 'end_date', 'size')
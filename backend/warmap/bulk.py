@@ -0,0 +1,222 @@
+"""Bulk create/update endpoint shared by the Location, Event and Movement viewsets."""
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.db import DataError, IntegrityError, transaction
+from django.db.models import Q
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.response import Response
+from core.versioning import bump_version
+from .models import Location
+
+
+class NDJSONParser(BaseParser):
+    """Newline-delimited JSON or GeoJSON: one object per line."""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        items = []
+        for number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as e:
+                raise ParseError(f'Line {number}: {e}')
+        return items
+
+
+class GeoJSONSeqParser(NDJSONParser):
+    media_type = 'application/geo+json-seq'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        # RFC 8142 prefixes every record with an ASCII record separator
+        lines = (line.replace(b'\x1e', b'') for line in stream)
+        return super().parse(lines, media_type, parser_context)
+
+
+def flatten_feature(item, geometry_field):
+    """Turn a GeoJSON Feature into a flat item; other objects are unchanged."""
+    if not isinstance(item, dict) or item.get('type') != 'Feature':
+        return item
+    flat = dict(item.get('properties') or {})
+    if item.get('geometry') is not None and geometry_field not in flat:
+        flat[geometry_field] = item['geometry']
+    return flat
+
+
+def resolve_locations(references):
+    """Map ``(kind, value)`` references to Locations with one query.
+
+    Names shared by several locations resolve to the oldest one.
+    """
+    ids, names, points = set(), set(), set()
+    for kind, value in references:
+        {'id': ids, 'name': names, 'point': points}[kind].add(value)
+
+    if not (ids or names or points):
+        return {}
+    conditions = [Q(pk__in=ids), Q(name__in=names)] + [
+        Q(point__same_as=Point(x, y, srid=4326)) for x, y in points
+    ]
+
+    locations = {}
+    for location in Location.objects.filter(reduce(or_, conditions)).order_by('pk'):
+        locations.setdefault(('id', location.pk), location)
+        locations.setdefault(('name', location.name), location)
+        locations.setdefault(('point', (location.point.x, location.point.y)), location)
+    return locations
+
+
+class BulkUpsertMixin:
+    """``POST <list>/bulk/`` creating and updating many rows in one transaction.
+
+    The body is a JSON array, a GeoJSON FeatureCollection, or newline-delimited
+    JSON/GeoJSON. Items with an ``id`` replace that row, the others are
+    created; when several items share an id only the last one is applied.
+    Every item gets a result, and invalid items do not stop the valid ones
+    from being written.
+    """
+    bulk_serializer_class = None
+    # Serializer fields holding LocationReferenceField references
+    bulk_location_fields = []
+    # Field a GeoJSON Feature's geometry is assigned to
+    bulk_geometry_field = None
+
+    def get_bulk_items(self, data):
+        if isinstance(data, dict) and data.get('type') == 'FeatureCollection':
+            data = data.get('features')
+        if not isinstance(data, list) or not data:
+            raise ValidationError({
+                'error': 'Expected a list of items, a FeatureCollection or newline-delimited JSON'
+            })
+        if len(data) > settings.WARMAP_BULK_MAX_ITEMS:
+            raise ValidationError({
+                'error': f'At most {settings.WARMAP_BULK_MAX_ITEMS} items per request'
+            })
+        return [flatten_feature(item, self.bulk_geometry_field) for item in data]
+
+    def publish_bulk_changes(self, changes):
+        """Hook for views that announce (action, instance, previous) changes."""
+
+    @action(
+        detail=False,
+        methods=['post'],
+        parser_classes=[JSONParser, NDJSONParser, GeoJSONSeqParser]
+    )
+    def bulk(self, request):
+        """Create or update many rows at once"""
+        items = self.get_bulk_items(request.data)
+        model = self.bulk_serializer_class.Meta.model
+        results = [None] * len(items)
+
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.bulk_serializer_class(data=item)
+            if serializer.is_valid():
+                valid.append((index, dict(serializer.validated_data)))
+            else:
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+
+        # One statement cannot update a row twice; the last item for an id wins
+        last_for_id = {data['id']: index for index, data in valid if data.get('id') is not None}
+        for index, data in valid:
+            if data.get('id') is not None and last_for_id[data['id']] != index:
+                results[index] = {'index': index, 'status': 'error', 'errors': {
+                    'id': [f"Superseded by item {last_for_id[data['id']]} with the same id."]
+                }}
+        valid = [(index, data) for index, data in valid if results[index] is None]
+
+        locations = resolve_locations(
+            data[field]
+            for _, data in valid
+            for field in self.bulk_location_fields
+            if data.get(field) is not None
+        )
+        ids = {data['id'] for _, data in valid if data.get('id') is not None}
+        # Rows as stored before the write, for the previous state of live updates
+        existing = self.get_queryset().in_bulk(ids)
+        has_creator = any(field.name == 'created_by' for field in model._meta.fields)
+
+        objects = []
+        for index, data in valid:
+            errors = {}
+            for field in self.bulk_location_fields:
+                if data.get(field) is None:
+                    continue
+                location = locations.get(data[field])
+                if location is None:
+                    errors[field] = ['Location not found.']
+                data[field] = location
+            if data.get('id') is not None and data['id'] not in existing:
+                errors['id'] = [f"{model._meta.verbose_name} {data['id']} does not exist."]
+            if errors:
+                results[index] = {'index': index, 'status': 'error', 'errors': errors}
+                continue
+
+            instance = model(**data)
+            if has_creator and instance.pk is None:
+                instance.created_by = request.user
+            objects.append((index, instance))
+
+        updated = {index for index, instance in objects if instance.pk is not None}
+        update_fields = [
+            field.name for field in model._meta.concrete_fields
+            if field.name not in ('id', 'created_by', 'created_at')
+        ]
+        write_error = None
+        if objects:
+            try:
+                with transaction.atomic():
+                    model.objects.bulk_create(
+                        [instance for _, instance in objects],
+                        update_conflicts=True,
+                        unique_fields=['id'],
+                        update_fields=update_fields,
+                        batch_size=1000
+                    )
+                    # bulk_create skips the signals
+                    bump_version(model)
+                    self.publish_bulk_changes([
+                        ('updated', instance, existing[instance.pk]) if index in updated
+                        else ('created', instance, None)
+                        for index, instance in objects
+                    ])
+            except (IntegrityError, DataError) as e:
+                # The batch is rolled back as a whole
+                write_error = str(e)
+
+        for index, instance in objects:
+            if write_error:
+                results[index] = {
+                    'index': index,
+                    'status': 'error',
+                    'errors': {'non_field_errors': [f'Not written: {write_error}']},
+                }
+            else:
+                results[index] = {
+                    'index': index,
+                    'status': 'updated' if index in updated else 'created',
+                    'id': instance.pk,
+                }
+
+        errors = sum(1 for result in results if result['status'] == 'error')
+        if errors == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif errors:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({
+            'created': sum(1 for result in results if result['status'] == 'created'),
+            'updated': sum(1 for result in results if result['status'] == 'updated'),
+            'errors': errors,
+            'results': results,
+        }, status=response_status)
@@ -0,0 +1,64 @@
+import math
+
+from django.contrib.gis.geos import Polygon
+from django.db.models import Subquery
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from .models import Area
+
+
+def parse_bbox(value):
+    """Parse ``min_lng,min_lat,max_lng,max_lat`` into a polygon, or raise ValueError."""
+    coords = [float(coord) for coord in value.split(',')]
+    if len(coords) != 4:
+        raise ValueError
+    min_lng, min_lat, max_lng, max_lat = coords
+    # float() accepts nan and inf, which PostGIS rejects or cannot index
+    if not all(math.isfinite(coord) for coord in coords):
+        raise ValueError
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError
+    bbox = Polygon.from_bbox(coords)
+    bbox.srid = 4326
+    return bbox
+
+
+class BoundingBoxFilter(BaseFilterBackend):
+    """Restrict results to a viewport (``?bbox=``) or a zone (``?within=<area_id>``).
+
+    The indexed ``&&`` operator (``bboverlaps``) prunes candidates before the
+    exact intersection test. Views name the geometry to test with
+    ``bbox_filter_field``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        field = getattr(view, 'bbox_filter_field', None)
+        if not field:
+            return queryset
+
+        bbox = request.query_params.get('bbox')
+        if bbox:
+            try:
+                bbox = parse_bbox(bbox)
+            except ValueError:
+                raise ValidationError({
+                    'error': 'Invalid bbox parameter. Use min_lng,min_lat,max_lng,max_lat'
+                })
+            queryset = queryset.filter(**{
+                f'{field}__bboverlaps': bbox,
+                f'{field}__intersects': bbox,
+            })
+
+        within = request.query_params.get('within')
+        if within:
+            try:
+                within = int(within)
+            except ValueError:
+                raise ValidationError({'error': 'Invalid within parameter. Use an area id'})
+            zone = Subquery(Area.objects.filter(pk=within).values('polygon')[:1])
+            queryset = queryset.filter(**{
+                f'{field}__bboverlaps': zone,
+                f'{field}__intersects': zone,
+            })
+
+        return queryset
@@ -0,0 +1,30 @@
+"""PostGIS functions not shipped with django.contrib.gis."""
+from django.contrib.gis.db.models.functions import GeomOutputGeoFunc
+from django.db.models import BooleanField, FloatField, Func
+
+
+class SimplifyPreserveTopology(GeomOutputGeoFunc):
+    function = 'ST_SimplifyPreserveTopology'
+
+
+class Multi(GeomOutputGeoFunc):
+    function = 'ST_Multi'
+
+
+class GeographyDWithin(Func):
+    """``ST_DWithin`` on geography arguments, with the distance in meters."""
+    function = 'ST_DWithin'
+    output_field = BooleanField()
+
+
+class GeographyDistance(Func):
+    """``ST_Distance`` on geography arguments, in meters."""
+    function = 'ST_Distance'
+    output_field = FloatField()
+
+
+class KNNDistance(Func):
+    """``<->`` distance operator, which lets ORDER BY walk a GiST index."""
+    arg_joiner = ' <-> '
+    template = '(%(expressions)s)'
+    output_field = FloatField()
@@ -0,0 +1,241 @@
+"""Live Event and Movement changes, pushed to /api/warmap/live/.
+
+Saves and deletes publish a small GeoJSON feature through Postgres NOTIFY.
+Each worker indexes its subscribers' viewports on a grid, so a change is
+only tested against the subscriptions whose cells it touches.
+
+Updates also carry the feature's previous bbox, geometry and properties.
+They reach the subscribers matching either state, and those that only
+matched the previous one receive them as ``removed``.
+"""
+import json
+import math
+from collections import defaultdict
+
+from core.broadcast import Broadcaster, notify, notify_many
+
+FEATURES_CHANNEL = 'warmap_features'
+
+# NOTIFY payloads are capped at 8000 bytes; larger features are sent without
+# geometry and clients fetch them
+MAX_PAYLOAD_SIZE = 7500
+
+# Grid cell size in degrees, and the most cells one viewport is indexed in
+# before it is treated as covering the whole map
+CELL_SIZE = 1.0
+MAX_INDEXED_CELLS = 400
+
+
+def grid_cells(bbox):
+    """Grid cells covered by ``bbox``, or None when there are too many."""
+    min_x, min_y, max_x, max_y = (math.floor(coord / CELL_SIZE) for coord in bbox)
+    if (max_x - min_x + 1) * (max_y - min_y + 1) > MAX_INDEXED_CELLS:
+        return None
+    return [
+        (x, y)
+        for x in range(min_x, max_x + 1)
+        for y in range(min_y, max_y + 1)
+    ]
+
+
+def bbox_intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class ViewportBroadcaster(Broadcaster):
+    """Broadcaster indexing subscribers by the grid cells of their viewport."""
+
+    def __init__(self, channel):
+        super().__init__(channel)
+        self.cells = defaultdict(set)
+        self.subscriber_cells = {}
+        # Subscribers without a viewport, or with a very large one
+        self.everywhere = set()
+
+    def add(self, queue, predicate, bbox=None, **subscription):
+        super().add(queue, predicate)
+        cells = grid_cells(bbox) if bbox else None
+        if cells is None:
+            self.everywhere.add(queue)
+        else:
+            for cell in cells:
+                self.cells[cell].add(queue)
+        self.subscriber_cells[queue] = cells
+
+    def remove(self, queue):
+        super().remove(queue)
+        self.everywhere.discard(queue)
+        for cell in self.subscriber_cells.pop(queue, None) or []:
+            self.cells[cell].discard(queue)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def subscribers_for(self, message):
+        bboxes = [message['bbox']]
+        if message.get('previous'):
+            bboxes.append(message['previous']['bbox'])
+        cells = set()
+        for bbox in bboxes:
+            bbox_cells = grid_cells(bbox)
+            if bbox_cells is None:
+                cells = None
+                break
+            cells.update(bbox_cells)
+
+        if cells is None:
+            candidates = self.subscribers.keys()
+        else:
+            candidates = set(self.everywhere)
+            for cell in cells:
+                candidates |= self.cells.get(cell, set())
+        return [queue for queue in candidates if self.subscribers[queue](message)]
+
+
+feature_broadcaster = ViewportBroadcaster(FEATURES_CHANNEL)
+
+
+def feature_message(layer, action, instance, geometry, properties, previous=None):
+    """Message announcing that ``instance`` of ``layer`` was created, updated or deleted.
+
+    ``previous`` is the (geometry, properties) of an updated feature before
+    the change.
+    """
+    if geometry is None:
+        if not previous or previous[0] is None:
+            return None
+        # No longer on the map: remove it where it was shown
+        action, (geometry, properties), previous = 'deleted', previous, None
+    message = {
+        'layer': layer,
+        'action': action,
+        'bbox': list(geometry.extent),
+        'feature': {
+            'type': 'Feature',
+            'id': instance.pk,
+            'geometry': json.loads(geometry.geojson),
+            'properties': properties,
+        },
+    }
+    if previous and previous[0] is not None:
+        previous_geometry, previous_properties = previous
+        message['previous'] = {
+            'bbox': list(previous_geometry.extent),
+            'geometry': json.loads(previous_geometry.geojson),
+            'properties': previous_properties,
+        }
+    # Large geometries are left out, the previous one first; clients fetch them
+    for part in (message.get('previous'), message['feature']):
+        if part and len(json.dumps(message, default=str)) > MAX_PAYLOAD_SIZE:
+            part['geometry'] = None
+    return message
+
+
+def event_geometry(event):
+    return event.location.point if event.location_id else None
+
+
+def event_properties(event):
+    return {
+        'title': event.title,
+        'event_type': event.event_type,
+        'severity': event.severity,
+        'verified': event.verified,
+        'casualties': event.casualties,
+        'start_date': event.start_date,
+        'end_date': event.end_date,
+        'location': event.location_id,
+    }
+
+
+def movement_properties(movement):
+    return {
+        'name': movement.name,
+        'movement_type': movement.movement_type,
+        'size': movement.size,
+        'start_date': movement.start_date,
+        'end_date': movement.end_date,
+        'start_location': movement.start_location_id,
+        'end_location': movement.end_location_id,
+    }
+
+
+def event_message(action, event, previous=None):
+    """``previous`` is the event as stored before an update."""
+    if previous is not None:
+        previous = (event_geometry(previous), event_properties(previous))
+    return feature_message(
+        'events', action, event, event_geometry(event), event_properties(event), previous
+    )
+
+
+def movement_message(action, movement, previous=None):
+    """``previous`` is the movement as stored before an update."""
+    if previous is not None:
+        previous = (previous.line, movement_properties(previous))
+    return feature_message(
+        'movements', action, movement, movement.line, movement_properties(movement), previous
+    )
+
+
+def publish_event(action, event, previous=None):
+    message = event_message(action, event, previous)
+    if message:
+        notify(FEATURES_CHANNEL, message)
+
+
+def publish_movement(action, movement, previous=None):
+    message = movement_message(action, movement, previous)
+    if message:
+        notify(FEATURES_CHANNEL, message)
+
+
+def publish_many(build_message, changes):
+    """Publish (action, instance, previous) changes from a bulk write in one query."""
+    messages = [build_message(*change) for change in changes]
+    notify_many(FEATURES_CHANNEL, [message for message in messages if message])
+
+
+class Subscription:
+    """Viewport, layers and property filters of one live feed client.
+
+    Filters only apply to the layers that have the property.
+    """
+
+    def __init__(self, bbox, layers, filters):
+        self.bbox = bbox
+        self.layers = layers
+        self.filters = filters
+
+    def matches(self, layer, bbox, properties):
+        if layer not in self.layers:
+            return False
+        if self.bbox and not bbox_intersects(self.bbox, bbox):
+            return False
+        return all(
+            properties[key] == value
+            for key, value in self.filters.items()
+            if key in properties
+        )
+
+    def matches_current(self, message):
+        return self.matches(message['layer'], message['bbox'], message['feature']['properties'])
+
+    def __call__(self, message):
+        """Whether ``message`` concerns this subscription before or after the change."""
+        if self.matches_current(message):
+            return True
+        previous = message.get('previous')
+        return bool(previous) and self.matches(
+            message['layer'], previous['bbox'], previous['properties']
+        )
+
+    async def messages(self, messages):
+        """Subscribed messages as this client sees them.
+
+        An update that no longer matches, because the feature left the
+        viewport or the filters, becomes a ``removed`` message.
+        """
+        async for message in messages:
+            if message and message['action'] == 'updated' and not self.matches_current(message):
+                message = {**message, 'action': 'removed'}
+            yield message
@@ -0,0 +1,183 @@
+import random
+import time
+
+from django.contrib.gis.geos import LineString, MultiPolygon, Point, Polygon
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+from warmap.models import Area, AreaDailyStats, AreaHistory, Event, Location, Movement
+from warmap.views import AreaViewSet, EventViewSet, LocationViewSet, MovementViewSet
+
+# Rough bounding box of eastern DRC (min lng, min lat, max lng, max lat)
+BOUNDS = (27.0, -5.0, 30.5, 1.0)
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic warmap rows and report p50/p95 latency of every custom '
+        'action, with and without the model indexes. All changes are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help='Number of synthetic events and movements')
+        parser.add_argument('--zones', type=int, default=200, help='Number of synthetic zones')
+        parser.add_argument('--revisions', type=int, default=20, help='Revisions per zone')
+        parser.add_argument('--iterations', type=int, default=20, help='Requests per action')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def random_point(self):
+        return Point(
+            random.uniform(BOUNDS[0], BOUNDS[2]),
+            random.uniform(BOUNDS[1], BOUNDS[3]),
+            srid=4326
+        )
+
+    def seed(self, rows, zones, revisions):
+        now = timezone.now()
+        today = now.date()
+        statuses = [choice for choice, _ in Area.ZONE_STATUS_CHOICES]
+
+        locations = Location.objects.bulk_create([
+            Location(name=f'Benchmark location {i}', point=self.random_point())
+            for i in range(max(rows // 10, 1))
+        ])
+
+        Event.objects.bulk_create([
+            Event(
+                title=f'Benchmark event {i}',
+                description='Synthetic event',
+                event_type=random.choice(Event.EVENT_TYPES)[0],
+                severity=random.choice(Event.SEVERITY_LEVELS)[0],
+                location=random.choice(locations),
+                start_date=now - timezone.timedelta(days=random.randint(0, 365)),
+                verified=random.random() < 0.5,
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+
+        movements = []
+        for i in range(rows):
+            start, end = random.sample(locations, 2) if len(locations) > 1 else (locations[0], locations[0])
+            start_date = now - timezone.timedelta(days=random.randint(0, 365))
+            movements.append(Movement(
+                name=f'Benchmark movement {i}',
+                movement_type=random.choice(Movement.MOVEMENT_TYPES)[0],
+                line=LineString(start.point, end.point, srid=4326),
+                start_location=start,
+                end_location=end,
+                start_date=start_date,
+                end_date=None if random.random() < 0.1 else start_date + timezone.timedelta(days=random.randint(1, 30)),
+                size=random.randint(10, 10000),
+            ))
+        Movement.objects.bulk_create(movements, batch_size=1000)
+
+        areas = []
+        for zone in range(zones):
+            center = self.random_point()
+            square = Polygon.from_bbox((
+                center.x - 0.1, center.y - 0.1, center.x + 0.1, center.y + 0.1
+            ))
+            for revision in range(revisions):
+                areas.append(Area(
+                    name=f'Benchmark zone {zone}',
+                    polygon=MultiPolygon(square, srid=4326),
+                    status=random.choice(statuses),
+                    date=today - timezone.timedelta(days=revision * 7),
+                    population=random.randint(1000, 500000),
+                    strategic_value=random.randint(1, 3),
+                ))
+        areas = Area.objects.bulk_create(areas, batch_size=1000)
+        AreaHistory.objects.bulk_create([
+            AreaHistory(
+                area=area,
+                name=area.name,
+                polygon=area.polygon,
+                status=area.status,
+                date=area.date,
+                population=area.population,
+                strategic_value=area.strategic_value,
+            )
+            for area in areas
+        ], batch_size=1000)
+
+        # bulk_create skips the signals that maintain the snapshot
+        call_command('refresh_area_status', stdout=self.stdout)
+
+    def actions(self):
+        today = timezone.now().date()
+        month_ago = today - timezone.timedelta(days=30)
+        return [
+            (LocationViewSet, 'nearby', '/api/warmap/locations/nearby/', {'lat': -1.5, 'lng': 29.2, 'radius': 50}),
+            (EventViewSet, 'recent', '/api/warmap/events/recent/', {'days': 7}),
+            (EventViewSet, 'by_location', '/api/warmap/events/by_location/', {'bounds': '28.5,-2,29.5,-1'}),
+            (AreaViewSet, 'current_status', '/api/warmap/areas/current_status/', {}),
+            (AreaViewSet, 'current_status', '/api/warmap/areas/current_status/', {'date': month_ago.isoformat()}),
+            (AreaViewSet, 'status_changes', '/api/warmap/areas/status_changes/', {
+                'start_date': month_ago.isoformat(), 'end_date': today.isoformat()
+            }),
+            (AreaViewSet, 'zone_history', '/api/warmap/areas/zone_history/', {'name': 'Benchmark zone 0'}),
+            (AreaViewSet, 'statistics', '/api/warmap/areas/statistics/', {'date': month_ago.isoformat()}),
+            (MovementViewSet, 'active', '/api/warmap/movements/active/', {}),
+            (MovementViewSet, 'by_period', '/api/warmap/movements/by_period/', {
+                'start': month_ago.isoformat(), 'end': today.isoformat()
+            }),
+        ]
+
+    def measure(self, iterations):
+        factory = APIRequestFactory()
+        results = []
+        # Start each run without stored rollups so statistics is comparable
+        AreaDailyStats.objects.all().delete()
+        for viewset, action, url, params in self.actions():
+            view = viewset.as_view({'get': action})
+            timings = []
+            for _ in range(iterations):
+                request = factory.get(url, params)
+                started = time.perf_counter()
+                response = view(request)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                else:
+                    response.render()
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            label = f'{url}?{"&".join(f"{k}={v}" for k, v in params.items())}'.rstrip('?')
+            results.append((
+                label,
+                timings[len(timings) // 2],
+                timings[min(int(len(timings) * 0.95), len(timings) - 1)],
+            ))
+        return results
+
+    def drop_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for model in (Location, Event, Area, AreaHistory, Movement):
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+
+        # The response cache would turn every repeated request into a hit
+        no_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(ALLOWED_HOSTS=['testserver'], CACHES=no_cache), transaction.atomic():
+            self.stdout.write('Seeding synthetic data...')
+            self.seed(options['rows'], options['zones'], options['revisions'])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            after = self.measure(options['iterations'])
+            self.drop_indexes()
+            before = self.measure(options['iterations'])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f'{"action":<75} {"before p50":>11} {"before p95":>11} {"after p50":>11} {"after p95":>11}'
+        )
+        for (label, before_p50, before_p95), (_, after_p50, after_p95) in zip(before, after):
+            self.stdout.write(
+                f'{label:<75} {before_p50:>9.1f}ms {before_p95:>9.1f}ms {after_p50:>9.1f}ms {after_p95:>9.1f}ms'
+            )
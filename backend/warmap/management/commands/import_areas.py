@@ -0,0 +1,263 @@
+import datetime
+
+from django.contrib.gis.gdal import CoordTransform, DataSource, GDALException, SpatialReference
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from core.versioning import bump_version
+from warmap.models import ZOOM_BANDS, Area, AreaDailyStats
+
+STAGING_TABLE = 'warmap_area_import'
+
+NAME_MAX_LENGTH = Area._meta.get_field('name').max_length
+# Largest value of a Postgres integer column
+MAX_INTEGER = 2 ** 31 - 1
+
+class Command(BaseCommand):
+    help = (
+        'Import zones from a GeoJSON, Shapefile or GeoPackage layer. Features '
+        'are reprojected to EPSG:4326, streamed into a staging table with COPY, '
+        'repaired with ST_MakeValid and merged into Area in one statement; '
+        'replaced revisions are recorded in AreaHistory.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Any vector file GDAL can read')
+        parser.add_argument('--layer', default='0', help='Layer name or index (default: first layer)')
+        parser.add_argument('--name-field', default='name')
+        parser.add_argument('--status-field', default='status')
+        parser.add_argument('--date-field', help='Field with the revision date; --date is used when absent')
+        parser.add_argument('--date', help='Revision date for every zone (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--description-field')
+        parser.add_argument('--population-field')
+        parser.add_argument('--strategic-value-field')
+        parser.add_argument(
+            '--default-status',
+            choices=[choice for choice, _ in Area.ZONE_STATUS_CHOICES],
+            help='Status of features without a valid one'
+        )
+        parser.add_argument('--source-srid', type=int, help='SRID of the data when the file does not declare one')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Features read between progress reports')
+
+    def get_layer(self, path, layer):
+        try:
+            source = DataSource(path)
+        except GDALException as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+        try:
+            return source[int(layer) if layer.isdigit() else layer]
+        except (IndexError, GDALException):
+            raise CommandError(f'Layer "{layer}" not found in {path}')
+
+    def get_transform(self, layer, source_srid):
+        srs = layer.srs
+        if source_srid:
+            srs = SpatialReference(source_srid)
+        if srs is None:
+            raise CommandError('The layer has no spatial reference; pass --source-srid')
+        return CoordTransform(srs, SpatialReference(4326))
+
+    def feature_rows(self, layer, fields, options, default_date):
+        """Yield staging rows, or None for features that cannot be imported."""
+        transform = self.get_transform(layer, options['source_srid'])
+        statuses = {choice for choice, _ in Area.ZONE_STATUS_CHOICES}
+
+        def value(feature, key):
+            field = fields.get(key)
+            return feature.get(field) if field else None
+
+        for feature in layer:
+            geom = feature.geom
+            name = value(feature, 'name')
+            status = value(feature, 'status') or options['default_status']
+            if status not in statuses:
+                status = options['default_status']
+            date = value(feature, 'date') or default_date
+            try:
+                if isinstance(date, str):
+                    date = parse_date(date)
+                elif isinstance(date, datetime.datetime):
+                    date = date.date()
+            except ValueError:
+                # Well formed but impossible, e.g. 2024-02-30
+                date = None
+            if not isinstance(date, datetime.date):
+                date = None
+            name = str(name or '').strip()
+            if len(name) > NAME_MAX_LENGTH:
+                name = None
+            if geom is None or not name or not status or not date:
+                yield None
+                continue
+
+            geom.transform(transform)
+            try:
+                population = value(feature, 'population')
+                population = int(float(population)) if population not in (None, '') else None
+            except (TypeError, ValueError, OverflowError):
+                population = None
+            if population is not None and not 0 <= population <= MAX_INTEGER:
+                population = None
+            strategic_value = value(feature, 'strategic_value')
+            yield (
+                name,
+                value(feature, 'description') or '',
+                status,
+                date,
+                population,
+                int(strategic_value) if strategic_value in (1, 2, 3, '1', '2', '3') else 1,
+                geom.hex,
+            )
+
+    def create_staging_table(self, cursor):
+        cursor.execute(f'''
+            CREATE TEMPORARY TABLE {STAGING_TABLE} (
+                seq bigserial,
+                name varchar({NAME_MAX_LENGTH}),
+                description text,
+                status varchar(20),
+                date date,
+                population integer,
+                strategic_value integer,
+                geom geometry
+            ) ON COMMIT DROP
+        ''')
+
+    def copy_features(self, cursor, rows, chunk_size):
+        copied = skipped = 0
+        # Django's cursor wraps a psycopg 3 cursor, which streams COPY rows
+        with cursor.cursor.copy(
+            f'COPY {STAGING_TABLE} (name, description, status, date, population, '
+            f'strategic_value, geom) FROM STDIN'
+        ) as copy:
+            for row in rows:
+                if row is None:
+                    skipped += 1
+                    continue
+                copy.write_row(row)
+                copied += 1
+                if copied % chunk_size == 0:
+                    self.stdout.write(f'Copied {copied} features')
+        return copied, skipped
+
+    def clean_staging(self, cursor):
+        """Repair geometries and keep one row per zone and date; return rows dropped."""
+        cursor.execute(f'''
+            UPDATE {STAGING_TABLE}
+            SET geom = ST_Multi(ST_CollectionExtract(
+                ST_MakeValid(ST_Force2D(ST_SetSRID(geom, 4326))), 3
+            ))
+        ''')
+        cursor.execute(f'DELETE FROM {STAGING_TABLE} WHERE geom IS NULL OR ST_IsEmpty(geom)')
+        dropped = cursor.rowcount
+        # The last feature for a zone and date wins, like repeated saves
+        cursor.execute(f'''
+            DELETE FROM {STAGING_TABLE}
+            WHERE seq NOT IN (
+                SELECT DISTINCT ON (name, date) seq
+                FROM {STAGING_TABLE}
+                ORDER BY name, date, seq DESC
+            )
+        ''')
+        return dropped + cursor.rowcount
+
+    def merge(self, cursor):
+        """Upsert staged zones into Area and record replaced revisions in AreaHistory.
+
+        Mirrors Area.save(): updating an existing revision adds a history row
+        with the new values. Returns (created, updated).
+        """
+        tolerances = {max_zoom: tolerance for max_zoom, tolerance, _ in ZOOM_BANDS}
+        simplified = {
+            field: f'ST_Multi(ST_SimplifyPreserveTopology(geom, {tolerances[max_zoom]}))'
+            for max_zoom, field in Area.SIMPLIFIED_POLYGONS.items()
+        }
+        simplified_columns = ''.join(f', {field}' for field in simplified)
+        simplified_values = ''.join(f', {expression}' for expression in simplified.values())
+        simplified_updates = ''.join(f', {field} = EXCLUDED.{field}' for field in simplified)
+
+        cursor.execute(f'''
+            WITH merged AS (
+                INSERT INTO warmap_area (
+                    name, description, polygon, status, date, population,
+                    strategic_value, created_at, updated_at{simplified_columns}
+                )
+                SELECT
+                    name, description, geom, status, date, population,
+                    strategic_value, now(), now(){simplified_values}
+                FROM {STAGING_TABLE}
+                ON CONFLICT (name, date) DO UPDATE SET
+                    description = EXCLUDED.description,
+                    polygon = EXCLUDED.polygon,
+                    status = EXCLUDED.status,
+                    population = EXCLUDED.population,
+                    strategic_value = EXCLUDED.strategic_value,
+                    updated_at = EXCLUDED.updated_at{simplified_updates}
+                RETURNING id, name, polygon, status, date, population,
+                          strategic_value, xmax::text <> '0' AS updated
+            ),
+            history AS (
+                INSERT INTO warmap_areahistory (
+                    area_id, name, polygon, status, date, population,
+                    strategic_value, recorded_at
+                )
+                SELECT id, name, polygon, status, date, population, strategic_value, now()
+                FROM merged
+                WHERE updated
+            )
+            SELECT count(*) FILTER (WHERE NOT updated), count(*) FILTER (WHERE updated)
+            FROM merged
+        ''')
+        return cursor.fetchone()
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+        if options['date']:
+            try:
+                default_date = parse_date(options['date'])
+            except ValueError:
+                default_date = None
+            if default_date is None:
+                raise CommandError(f'Invalid date "{options["date"]}". Use YYYY-MM-DD')
+        else:
+            default_date = timezone.now().date()
+
+        layer = self.get_layer(options['path'], options['layer'])
+        fields = {
+            key: options[f'{key}_field']
+            for key in ('name', 'status', 'date', 'description', 'population', 'strategic_value')
+            if options[f'{key}_field']
+        }
+        missing = [field for field in fields.values() if field not in layer.fields]
+        if missing:
+            raise CommandError(
+                f'Fields not in layer {layer.name}: {", ".join(missing)} '
+                f'(available: {", ".join(layer.fields)})'
+            )
+        self.stdout.write(f'Importing {layer.num_feat} features from layer {layer.name}')
+
+        rows = self.feature_rows(layer, fields, options, default_date)
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.create_staging_table(cursor)
+            copied, skipped = self.copy_features(cursor, rows, options['chunk_size'])
+            skipped += self.clean_staging(cursor)
+            created, updated = self.merge(cursor)
+            cursor.execute(f'SELECT min(date) FROM {STAGING_TABLE}')
+            earliest = cursor.fetchone()[0]
+
+            # The set-based merge skips the signals that maintain these
+            bump_version(Area)
+            call_command('refresh_area_status', stdout=self.stdout)
+            if earliest:
+                AreaDailyStats.invalidate(earliest)
+                today = timezone.now().date()
+                if earliest <= today:
+                    AreaDailyStats.rollup(today)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {created} new and {updated} updated zone revisions, '
+            f'skipped {skipped} features'
+        ))
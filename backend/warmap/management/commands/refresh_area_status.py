@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from warmap.models import Area, AreaCurrentStatus
+
+class Command(BaseCommand):
+    help = 'Rebuild the current zone status snapshot from all Area revisions'
+
+    def handle(self, *args, **kwargs):
+        latest_areas = Area.objects.order_by('name', '-date').distinct('name').only(
+            'id', 'name', 'status', 'date', 'population', 'strategic_value'
+        )
+
+        with transaction.atomic():
+            AreaCurrentStatus.objects.all().delete()
+            snapshots = AreaCurrentStatus.objects.bulk_create([
+                AreaCurrentStatus(
+                    name=area.name,
+                    area=area,
+                    status=area.status,
+                    date=area.date,
+                    population=area.population,
+                    strategic_value=area.strategic_value,
+                )
+                for area in latest_areas
+            ])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Refreshed current status for {len(snapshots)} zones')
+        )
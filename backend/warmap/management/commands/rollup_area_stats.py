@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from warmap.models import Area, AreaDailyStats
+
+class Command(BaseCommand):
+    help = 'Compute the daily zone control statistics rollup for a range of dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to roll up (YYYY-MM-DD), defaults to the earliest zone revision')
+        parser.add_argument('--end', help='Last date to roll up (YYYY-MM-DD), defaults to today')
+
+    def parse_date(self, value):
+        try:
+            return timezone.datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid date "{value}". Use YYYY-MM-DD')
+
+    def handle(self, *args, **options):
+        end = self.parse_date(options['end']) if options['end'] else timezone.now().date()
+        if options['start']:
+            start = self.parse_date(options['start'])
+        else:
+            start = Area.objects.aggregate(first=Min('date'))['first']
+            if start is None:
+                self.stdout.write('No zones to roll up')
+                return
+
+        day = start
+        count = 0
+        while day <= end:
+            AreaDailyStats.rollup(day)
+            day += timezone.timedelta(days=1)
+            count += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Rolled up zone statistics for {count} days ({start} to {end})')
+        )
@@ -0,0 +1,50 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_current_status(apps, schema_editor):
+    Area = apps.get_model('warmap', 'Area')
+    AreaCurrentStatus = apps.get_model('warmap', 'AreaCurrentStatus')
+    latest_areas = Area.objects.order_by('name', '-date').distinct('name')
+    AreaCurrentStatus.objects.bulk_create([
+        AreaCurrentStatus(
+            name=area.name,
+            area=area,
+            status=area.status,
+            date=area.date,
+            population=area.population,
+            strategic_value=area.strategic_value,
+        )
+        for area in latest_areas.iterator()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warmap', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='area',
+            index=models.Index(fields=['name', '-date'], name='warmap_area_name_date_idx'),
+        ),
+        migrations.CreateModel(
+            name='AreaCurrentStatus',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('occupied', 'Occupied Territory'), ('liberated', 'Liberated Zone'), ('contested', 'Contested Area'), ('government', 'Under Government Control')], max_length=20)),
+                ('date', models.DateField()),
+                ('population', models.IntegerField(blank=True, null=True)),
+                ('strategic_value', models.IntegerField(choices=[(1, 'Low'), (2, 'Medium'), (3, 'High')])),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('area', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='current_status', to='warmap.area')),
+            ],
+            options={
+                'verbose_name_plural': 'Area current statuses',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RunPython(populate_current_status, migrations.RunPython.noop),
+    ]
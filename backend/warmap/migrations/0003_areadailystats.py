@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warmap', '0002_areacurrentstatus'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AreaDailyStats',
+            fields=[
+                ('date', models.DateField(primary_key=True, serialize=False)),
+                ('total_zones', models.IntegerField(default=0)),
+                ('total_population', models.BigIntegerField(default=0)),
+                ('status_counts', models.JSONField(default=dict)),
+                ('population_by_status', models.JSONField(default=dict)),
+                ('strategic_value_by_status', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Area daily stats',
+                'ordering': ['-date'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+import django.contrib.gis.db.models.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warmap', '0003_areadailystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='area',
+            name='polygon_low',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, null=True, srid=4326),
+        ),
+        migrations.AddField(
+            model_name='area',
+            name='polygon_medium',
+            field=django.contrib.gis.db.models.fields.MultiPolygonField(blank=True, editable=False, null=True, srid=4326),
+        ),
+        migrations.RunSQL(
+            '''
+            UPDATE warmap_area SET
+                polygon_low = ST_Multi(ST_SimplifyPreserveTopology(polygon, 0.01)),
+                polygon_medium = ST_Multi(ST_SimplifyPreserveTopology(polygon, 0.001))
+            ''',
+            migrations.RunSQL.noop,
+        ),
+    ]
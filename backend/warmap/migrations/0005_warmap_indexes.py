@@ -0,0 +1,64 @@
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warmap', '0004_area_simplified_polygons'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['event_type', '-start_date'], name='warmap_event_type_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['severity', '-start_date'], name='warmap_event_sev_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['verified', '-start_date'], name='warmap_event_verif_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['start_date'], name='warmap_event_start_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='area',
+            index=models.Index(fields=['status', '-date'], name='warmap_area_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='area',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['date'], name='warmap_area_date_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='areahistory',
+            index=models.Index(fields=['area', '-recorded_at'], name='warmap_areahist_area_rec_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['movement_type', '-start_date'], name='warmap_mvmt_type_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['start_date', 'end_date'], name='warmap_mvmt_dates_brin'),
+        ),
+        # tstzrange() raises on a period that ends before it starts, which
+        # would abort the index build; such rows have their dates swapped
+        migrations.RunSQL(
+            '''
+            UPDATE warmap_movement
+            SET start_date = end_date, end_date = start_date
+            WHERE end_date < start_date
+            ''',
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=django.contrib.postgres.indexes.GistIndex(django.db.models.expressions.Func(models.F('start_date'), models.F('end_date'), models.Value('[]'), function='tstzrange', output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField()), name='warmap_mvmt_period_gist'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+import django.db.models.functions.comparison
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warmap', '0005_warmap_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=django.contrib.postgres.indexes.GistIndex(django.db.models.functions.comparison.Cast('point', output_field=django.contrib.gis.db.models.fields.PointField(geography=True)), name='warmap_location_geog_gist'),
+        ),
+    ]
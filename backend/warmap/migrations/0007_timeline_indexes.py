@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('warmap', '0006_location_geography_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['-start_date', '-id'], name='warmap_event_timeline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movement',
+            index=models.Index(fields=['-start_date', '-id'], name='warmap_mvmt_timeline_idx'),
+        ),
+    ]
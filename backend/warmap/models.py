@@ -1,8 +1,21 @@
 from django.contrib.gis.db import models
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.indexes import BrinIndex, GinIndex, GistIndex, OpClass
+from django.db import connection, transaction
+from django.db.models import Count, F, Func, Q, Sum, Value
+from django.db.models.functions import Cast, Upper
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
 
+def location_geography():
+    """Location point cast to geography, so distances are in meters."""
+    return Cast('point', output_field=models.PointField(geography=True))
+
+def trigram_index(field, name):
+    """Trigram index on UPPER(field), which serves the icontains lookups of SearchFilter."""
+    return GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=name)
+
 class Location(models.Model):
     name = models.CharField(_('Name'), max_length=255)
     description = models.TextField(_('Description'), blank=True)
@@ -16,6 +29,11 @@ class Location(models.Model):
     class Meta:
         verbose_name = _('Location')
         verbose_name_plural = _('Locations')
+        indexes = [
+            GistIndex(location_geography(), name='warmap_location_geog_gist'),
+            trigram_index('name', 'warmap_location_name_trgm'),
+            trigram_index('description', 'warmap_location_desc_trgm'),
+        ]
 
 class Event(models.Model):
     EVENT_TYPES = [
@@ -59,6 +77,38 @@ class Event(models.Model):
         verbose_name = _('Event')
         verbose_name_plural = _('Events')
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['event_type', '-start_date'], name='warmap_event_type_start_idx'),
+            models.Index(fields=['severity', '-start_date'], name='warmap_event_sev_start_idx'),
+            models.Index(fields=['verified', '-start_date'], name='warmap_event_verif_start_idx'),
+            BrinIndex(fields=['start_date'], name='warmap_event_start_brin'),
+            models.Index(fields=['-start_date', '-id'], name='warmap_event_timeline_idx'),
+            trigram_index('title', 'warmap_event_title_trgm'),
+            trigram_index('description', 'warmap_event_desc_trgm'),
+        ]
+
+# Standard zoom bands for simplified geometry:
+# (max zoom, simplify tolerance in degrees, coordinate precision)
+ZOOM_BANDS = [
+    (6, 0.01, 3),
+    (10, 0.001, 4),
+]
+
+class AreaQuerySet(models.QuerySet):
+    def as_of(self, date):
+        """Latest revision of every zone on or before the given date."""
+        current = AreaCurrentStatus.objects.filter(date__lte=date)
+        # Zones whose snapshot is newer than the date need an as-of lookup,
+        # served by the (name, -date) index
+        superseded = AreaCurrentStatus.objects.filter(date__gt=date).values('name')
+        previous = self.model.objects.filter(
+            name__in=superseded,
+            date__lte=date
+        ).order_by('name', '-date').distinct('name')
+        return self.filter(
+            Q(pk__in=current.values('area_id')) |
+            Q(pk__in=previous.values('pk'))
+        )
 
 class Area(models.Model):
     ZONE_STATUS_CHOICES = [
@@ -68,9 +118,17 @@ class Area(models.Model):
         ('government', 'Under Government Control')
     ]
 
+    # Precomputed simplified polygons for each zoom band, by max zoom
+    SIMPLIFIED_POLYGONS = {
+        6: 'polygon_low',
+        10: 'polygon_medium',
+    }
+
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     polygon = models.MultiPolygonField(srid=4326)
+    polygon_low = models.MultiPolygonField(srid=4326, null=True, blank=True, editable=False)
+    polygon_medium = models.MultiPolygonField(srid=4326, null=True, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=ZONE_STATUS_CHOICES)
     date = models.DateField(default=timezone.now)
     population = models.IntegerField(null=True, blank=True)
@@ -87,11 +145,18 @@ class Area(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AreaQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = 'Areas'
         ordering = ['-date', 'name']
         # Ensure we don't have duplicate zone statuses for the same date
         unique_together = ['name', 'date']
+        indexes = [
+            models.Index(fields=['name', '-date'], name='warmap_area_name_date_idx'),
+            models.Index(fields=['status', '-date'], name='warmap_area_status_date_idx'),
+            BrinIndex(fields=['date'], name='warmap_area_date_brin'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.status} ({self.date})"
@@ -124,10 +189,150 @@ class AreaHistory(models.Model):
     class Meta:
         ordering = ['-recorded_at']
         verbose_name_plural = 'Area histories'
+        indexes = [
+            models.Index(fields=['area', '-recorded_at'], name='warmap_areahist_area_rec_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.status} ({self.date}) [History]"
 
+class AreaCurrentStatus(models.Model):
+    """Snapshot of the latest revision of each zone, kept in sync with Area"""
+    name = models.CharField(max_length=255, primary_key=True)
+    area = models.OneToOneField(Area, on_delete=models.CASCADE, related_name='current_status')
+    status = models.CharField(max_length=20, choices=Area.ZONE_STATUS_CHOICES)
+    date = models.DateField()
+    population = models.IntegerField(null=True, blank=True)
+    strategic_value = models.IntegerField(choices=[(1, 'Low'), (2, 'Medium'), (3, 'High')])
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Area current statuses'
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} - {self.status} ({self.date}) [Current]"
+
+    @classmethod
+    def refresh(cls, name):
+        """Point the snapshot for ``name`` at its latest Area revision."""
+        latest = Area.objects.filter(name=name).order_by('-date').only(
+            'id', 'status', 'date', 'population', 'strategic_value'
+        ).first()
+        if latest is None:
+            cls.objects.filter(name=name).delete()
+            return None
+        snapshot, _ = cls.objects.update_or_create(
+            name=name,
+            defaults={
+                'area': latest,
+                'status': latest.status,
+                'date': latest.date,
+                'population': latest.population,
+                'strategic_value': latest.strategic_value,
+            }
+        )
+        return snapshot
+
+class AreaDailyStats(models.Model):
+    """Daily rollup of zone control statistics, keyed by date"""
+    date = models.DateField(primary_key=True)
+    total_zones = models.IntegerField(default=0)
+    total_population = models.BigIntegerField(default=0)
+    status_counts = models.JSONField(default=dict)
+    population_by_status = models.JSONField(default=dict)
+    strategic_value_by_status = models.JSONField(default=dict)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'Area daily stats'
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"Zone statistics ({self.date})"
+
+    @staticmethod
+    def compute(date):
+        """Aggregate the latest zone revisions as of ``date`` in one query."""
+        rows = Area.objects.as_of(date).values('status').annotate(
+            zones=Count('id'),
+            population=Sum('population'),
+            strategic_value=Sum('strategic_value')
+        ).order_by()
+
+        stats = {
+            'total_zones': 0,
+            'status_counts': {},
+            'total_population': 0,
+            'population_by_status': {},
+            'strategic_value_by_status': {}
+        }
+        for row in rows:
+            stats['total_zones'] += row['zones']
+            stats['status_counts'][row['status']] = row['zones']
+            if row['population']:
+                stats['total_population'] += row['population']
+                stats['population_by_status'][row['status']] = row['population']
+            stats['strategic_value_by_status'][row['status']] = row['strategic_value']
+        return stats
+
+    @classmethod
+    def lock(cls, shared=False):
+        """Take the rollup lock until the current transaction ends.
+
+        Reads computing a missing rollup share it; invalidation takes it
+        exclusively, so it waits for their rows and deletes them, and a read
+        starting after it sees the committed revision.
+        """
+        function = 'pg_advisory_xact_lock_shared' if shared else 'pg_advisory_xact_lock'
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT {function}(hashtext(%s))', [cls._meta.db_table])
+
+    @classmethod
+    def rollup(cls, date):
+        """Recompute and store the statistics for ``date``."""
+        stats, _ = cls.objects.update_or_create(date=date, defaults=cls.compute(date))
+        return stats
+
+    @classmethod
+    def for_date(cls, date):
+        """Return the stored rollup for ``date``, computing it on a miss.
+
+        A read never overwrites a stored row, which the save path may have
+        written from fresher data in the meantime.
+        """
+        stats = cls.objects.filter(pk=date).first()
+        if stats is None:
+            with transaction.atomic():
+                cls.lock(shared=True)
+                stats = cls(date=date, **cls.compute(date))
+                cls.objects.bulk_create([stats], ignore_conflicts=True)
+        return stats
+
+    @classmethod
+    def invalidate(cls, since):
+        """Drop rollups affected by a zone revision dated ``since``."""
+        with transaction.atomic():
+            cls.lock()
+            cls.objects.filter(date__gte=since).delete()
+
+    def as_dict(self):
+        return {
+            'total_zones': self.total_zones,
+            'status_counts': self.status_counts,
+            'total_population': self.total_population,
+            'population_by_status': self.population_by_status,
+            'strategic_value_by_status': self.strategic_value_by_status
+        }
+
+def movement_period():
+    """Time range covered by a movement, open-ended while it is ongoing."""
+    return Func(
+        F('start_date'), F('end_date'), Value('[]'),
+        function='tstzrange',
+        output_field=DateTimeRangeField()
+    )
+
 class Movement(models.Model):
     MOVEMENT_TYPES = [
         ('troops', _('Troop Movement')),
@@ -168,3 +373,16 @@ class Movement(models.Model):
         verbose_name = _('Movement')
         verbose_name_plural = _('Movements')
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['movement_type', '-start_date'], name='warmap_mvmt_type_start_idx'),
+            BrinIndex(fields=['start_date', 'end_date'], name='warmap_mvmt_dates_brin'),
+            GistIndex(movement_period(), name='warmap_mvmt_period_gist'),
+            models.Index(fields=['-start_date', '-id'], name='warmap_mvmt_timeline_idx'),
+        ]
+        constraints = [
+            # tstzrange() in warmap_mvmt_period_gist rejects reversed periods
+            models.CheckConstraint(
+                condition=Q(end_date__isnull=True) | Q(end_date__gte=F('start_date')),
+                name='warmap_mvmt_end_after_start'
+            ),
+        ]
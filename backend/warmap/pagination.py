@@ -0,0 +1,17 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class TimelineCursorPagination(CursorPagination):
+    """Keyset pagination for time-ordered warmap records.
+
+    Each page is read with ``WHERE start_date < <cursor> ORDER BY ... LIMIT``
+    instead of COUNT and OFFSET, so deep pages cost the same as the first one.
+    """
+    ordering = ('-start_date', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = settings.WARMAP_MAX_PAGE_SIZE
+
+
+class AreaHistoryCursorPagination(TimelineCursorPagination):
+    ordering = ('-recorded_at', '-id')
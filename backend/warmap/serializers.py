@@ -1,13 +1,33 @@
+import json
+
 from rest_framework import serializers
+from rest_framework_gis.fields import GeometryField
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 from .models import Location, Event, Area, Movement, AreaHistory
 
+class PrerenderedGeometryField(GeometryField):
+    """Geometry field that prefers GeoJSON rendered by the database.
+
+    Views annotate ``<field>_geojson`` with ``AsGeoJSON`` when the client asks
+    for simplified or reduced-precision geometry.
+    """
+    def get_attribute(self, instance):
+        geojson = getattr(instance, f'{self.source}_geojson', None)
+        if geojson is not None:
+            return json.loads(geojson)
+        return super().get_attribute(instance)
+
 class LocationSerializer(GeoFeatureModelSerializer):
+    point = PrerenderedGeometryField()
+
     class Meta:
         model = Location
         geo_field = 'point'
         fields = '__all__'
 
+class NearbyLocationSerializer(LocationSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
 class EventSerializer(serializers.ModelSerializer):
     location_data = LocationSerializer(source='location', read_only=True)
 
@@ -20,14 +40,25 @@ class EventSerializer(serializers.ModelSerializer):
         representation['created_by'] = instance.created_by.username if instance.created_by else None
         return representation
 
+    def validate(self, data):
+        return validate_movement_period(self, data)
+
 class AreaHistorySerializer(GeoFeatureModelSerializer):
+    polygon = PrerenderedGeometryField(read_only=True)
+
     class Meta:
         model = AreaHistory
         geo_field = "polygon"
         fields = ['id', 'name', 'status', 'date', 'population', 'strategic_value', 'recorded_at']
 
+class AreaHistorySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AreaHistory
+        fields = ['id', 'status', 'date', 'recorded_at']
+
 class AreaSerializer(GeoFeatureModelSerializer):
-    history = AreaHistorySerializer(many=True, read_only=True)
+    polygon = PrerenderedGeometryField()
+    history = AreaHistorySummarySerializer(many=True, read_only=True)
     created_by = serializers.StringRelatedField()
 
     class Meta:
@@ -36,6 +67,13 @@ class AreaSerializer(GeoFeatureModelSerializer):
         fields = ['id', 'name', 'description', 'polygon', 'status', 'date', 
                  'population', 'strategic_value', 'created_by', 'created_at', 
                  'updated_at', 'history']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # History is opt-in through ?include=history
+        if not self.context.get('include_history'):
+            fields.pop('history', None)
+        return fields
         
     def to_representation(self, instance):
         data = super().to_representation(instance)
@@ -69,7 +107,16 @@ class AreaSerializer(GeoFeatureModelSerializer):
                 )
         return data
 
+def validate_movement_period(serializer, data):
+    """Reject periods ending before they start, which the database refuses."""
+    start_date = data.get('start_date', getattr(serializer.instance, 'start_date', None))
+    end_date = data.get('end_date', getattr(serializer.instance, 'end_date', None))
+    if start_date and end_date and end_date < start_date:
+        raise serializers.ValidationError({'end_date': 'The end date cannot be before the start date.'})
+    return data
+
 class MovementSerializer(GeoFeatureModelSerializer):
+    line = PrerenderedGeometryField()
     start_location_data = LocationSerializer(source='start_location', read_only=True)
     end_location_data = LocationSerializer(source='end_location', read_only=True)
 
@@ -82,3 +129,69 @@ class MovementSerializer(GeoFeatureModelSerializer):
         representation = super().to_representation(instance)
         representation['created_by'] = instance.created_by.username if instance.created_by else None
         return representation
+
+class LocationReferenceField(serializers.Field):
+    """Reference to an existing Location, resolved in bulk by the view.
+
+    Accepts an id, a name, ``{"id": ...}``, ``{"name": ...}``, or coordinates
+    as ``{"coordinates": [lng, lat]}`` or a GeoJSON Point. Validates to an
+    ``(kind, value)`` tuple without querying the database.
+    """
+    default_error_messages = {
+        'invalid': 'Expected a location id, name, or {"id"|"name"|"coordinates": ...}.',
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('invalid')
+        if isinstance(data, int):
+            return ('id', data)
+        if isinstance(data, str) and data.strip():
+            return ('name', data.strip())
+        if isinstance(data, dict):
+            if 'id' in data:
+                try:
+                    return ('id', int(data['id']))
+                except (TypeError, ValueError):
+                    self.fail('invalid')
+            if 'name' in data:
+                return self.to_internal_value(str(data['name']))
+            coordinates = data.get('coordinates')
+            if isinstance(coordinates, (list, tuple)) and len(coordinates) == 2:
+                try:
+                    return ('point', (float(coordinates[0]), float(coordinates[1])))
+                except (TypeError, ValueError):
+                    pass
+        self.fail('invalid')
+
+    def to_representation(self, value):
+        return value
+
+class LocationBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    point = GeometryField()
+
+    class Meta:
+        model = Location
+        exclude = ['created_at', 'updated_at']
+
+class EventBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    location = LocationReferenceField()
+
+    class Meta:
+        model = Event
+        exclude = ['created_by', 'created_at', 'updated_at']
+
+class MovementBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    line = GeometryField()
+    start_location = LocationReferenceField()
+    end_location = LocationReferenceField()
+
+    class Meta:
+        model = Movement
+        exclude = ['created_by', 'created_at', 'updated_at']
+
+    def validate(self, data):
+        return validate_movement_period(self, data)
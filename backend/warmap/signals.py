@@ -0,0 +1,115 @@
+import datetime
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .functions import Multi, SimplifyPreserveTopology
+from .live import publish_event, publish_movement
+from .models import ZOOM_BANDS, Area, AreaCurrentStatus, AreaDailyStats, Event, Movement
+
+
+def _as_date(value):
+    # Area.date defaults to timezone.now, which is a datetime until reloaded
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def _refresh_daily_stats(since):
+    AreaDailyStats.invalidate(since)
+    today = timezone.now().date()
+    if since <= today:
+        AreaDailyStats.rollup(today)
+
+
+@receiver(pre_save, sender=Area)
+def remember_previous_date(sender, instance, **kwargs):
+    instance._previous_date = None
+    if instance.pk:
+        instance._previous_date = (
+            Area.objects.filter(pk=instance.pk).values_list('date', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Area)
+def update_current_status(sender, instance, **kwargs):
+    # A renamed revision may still back the snapshot of its previous name
+    renamed = list(
+        AreaCurrentStatus.objects.filter(area=instance)
+        .exclude(name=instance.name)
+        .values_list('name', flat=True)
+    )
+    AreaCurrentStatus.objects.filter(name__in=renamed).delete()
+    AreaCurrentStatus.refresh(instance.name)
+    for name in renamed:
+        AreaCurrentStatus.refresh(name)
+
+
+@receiver(post_save, sender=Area)
+def update_daily_stats(sender, instance, **kwargs):
+    since = _as_date(instance.date)
+    previous = getattr(instance, '_previous_date', None)
+    if previous is not None:
+        since = min(since, previous)
+    _refresh_daily_stats(since)
+
+
+@receiver(post_save, sender=Area)
+def update_simplified_polygons(sender, instance, **kwargs):
+    Area.objects.filter(pk=instance.pk).update(**{
+        Area.SIMPLIFIED_POLYGONS[max_zoom]: Multi(SimplifyPreserveTopology('polygon', tolerance))
+        for max_zoom, tolerance, _ in ZOOM_BANDS
+    })
+
+
+@receiver(post_delete, sender=Area)
+def remove_current_status(sender, instance, **kwargs):
+    AreaCurrentStatus.refresh(instance.name)
+
+
+@receiver(post_delete, sender=Area)
+def remove_daily_stats(sender, instance, **kwargs):
+    _refresh_daily_stats(_as_date(instance.date))
+
+
+@receiver(pre_save, sender=Event)
+def remember_previous_event(sender, instance, **kwargs):
+    # Live feed subscribers that only matched the old state must drop the event
+    instance._previous = None
+    if instance.pk:
+        instance._previous = (
+            Event.objects.select_related('location').filter(pk=instance.pk).first()
+        )
+
+
+@receiver(post_save, sender=Event)
+def broadcast_event_save(sender, instance, created, **kwargs):
+    if created:
+        publish_event('created', instance)
+    else:
+        publish_event('updated', instance, getattr(instance, '_previous', None))
+
+
+@receiver(post_delete, sender=Event)
+def broadcast_event_delete(sender, instance, **kwargs):
+    publish_event('deleted', instance)
+
+
+@receiver(pre_save, sender=Movement)
+def remember_previous_movement(sender, instance, **kwargs):
+    instance._previous = None
+    if instance.pk:
+        instance._previous = Movement.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Movement)
+def broadcast_movement_save(sender, instance, created, **kwargs):
+    if created:
+        publish_movement('created', instance)
+    else:
+        publish_movement('updated', instance, getattr(instance, '_previous', None))
+
+
+@receiver(post_delete, sender=Movement)
+def broadcast_movement_delete(sender, instance, **kwargs):
+    publish_movement('deleted', instance)
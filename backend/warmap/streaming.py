@@ -0,0 +1,98 @@
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import action
+from rest_framework.utils.encoders import JSONEncoder
+
+# Keep full coordinate precision unless the client asked for less
+STREAM_PRECISION = 15
+
+
+async def iterate_in_thread(iterator, batch_size):
+    """Async iterator over a sync one that queries the database.
+
+    Batches are read through sync_to_async, in the thread that serves the
+    ORM, so the server-side cursor stays on one connection.
+    """
+    next_batch = sync_to_async(lambda: list(islice(iterator, batch_size)))
+    while batch := await next_batch():
+        for item in batch:
+            yield item
+
+
+class GeoJSONStreamMixin:
+    """Stream querysets as GeoJSON FeatureCollections.
+
+    Rows are read with ``.iterator()`` and geometries are encoded by
+    ST_AsGeoJSON in the database, so neither the whole result set nor GEOS
+    objects are held in memory. Under ASGI the rows are produced by an async
+    iterator, since Django reads a sync one whole before sending it.
+    """
+    stream_chunk_size = 500
+    # Whether the serializer renders GeoJSON features; timelines of other
+    # serializers stream a plain array of the objects they paginate
+    serializer_is_geojson = True
+    # Location relations whose point is rendered by the database as well
+    stream_related_locations = []
+
+    def get_stream_queryset(self, queryset):
+        annotations = queryset.query.annotations
+        geometry_field = getattr(self, 'geometry_field', None)
+        if geometry_field and f'{geometry_field}_geojson' not in annotations:
+            queryset = queryset.annotate(**{
+                f'{geometry_field}_geojson': AsGeoJSON(geometry_field, precision=STREAM_PRECISION)
+            }).defer(geometry_field)
+        for relation in self.stream_related_locations:
+            queryset = queryset.annotate(**{
+                f'{relation}_point_geojson': AsGeoJSON(f'{relation}__point', precision=STREAM_PRECISION)
+            }).defer(f'{relation}__point')
+        return queryset
+
+    def get_feature(self, instance, data):
+        """Turn one serialized row into a GeoJSON feature."""
+        return data
+
+    def stream(self, queryset, geojson=True):
+        """Stream ``queryset`` as a FeatureCollection, or as a JSON array of
+        serialized objects with ``geojson=False``."""
+        queryset = self.get_stream_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        context = self.get_serializer_context()
+
+        def chunks():
+            yield '{"type": "FeatureCollection", "features": [' if geojson else '['
+            rows = queryset.iterator(chunk_size=self.stream_chunk_size)
+            for index, instance in enumerate(rows):
+                for relation in self.stream_related_locations:
+                    # Picked up by the nested serializer's PrerenderedGeometryField
+                    location = getattr(instance, relation)
+                    location.point_geojson = getattr(instance, f'{relation}_point_geojson')
+                data = serializer_class(instance, context=context).data
+                if geojson:
+                    data = self.get_feature(instance, data)
+                item = json.dumps(data, cls=JSONEncoder)
+                yield f',{item}' if index else item
+            yield ']}' if geojson else ']'
+
+        content = chunks()
+        if isinstance(self.request._request, ASGIRequest):
+            content = iterate_in_thread(content, self.stream_chunk_size)
+        content_type = 'application/geo+json' if geojson else 'application/json'
+        return StreamingHttpResponse(content, content_type=content_type)
+
+    def paginate_or_stream(self, queryset):
+        """Return one page of ``queryset``, or all of it with ``?stream=true``."""
+        if self.request.query_params.get('stream', '').lower() in ('true', '1'):
+            return self.stream(queryset, geojson=self.serializer_is_geojson)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every matching row as a GeoJSON FeatureCollection."""
+        return self.stream(self.filter_queryset(self.get_queryset()))
@@ -1,3 +1,613 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import io
+import json
+import math
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import cache
+from django.contrib.gis.geos import LineString, MultiPolygon, Point, Polygon
+from django.db import IntegrityError, connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from core.caching import ResponseCacheMixin
+from .live import Subscription, ViewportBroadcaster, event_message
+from .models import Area, AreaCurrentStatus, AreaDailyStats, AreaHistory, Event, Location, Movement
+
+User = get_user_model()
+
+
+class QueryBudgetTests(APITestCase):
+    """Every warmap read endpoint must stay within a fixed number of queries,
+    however many rows it returns. Each budget includes the change version
+    lookup made for conditional GETs."""
+    rows = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        today = now.date()
+        for i in range(cls.rows):
+            user = User.objects.create_user(
+                username=f'reporter{i}',
+                email=f'reporter{i}@example.com',
+                password='password'
+            )
+            start = Location.objects.create(name=f'Start {i}', point=Point(29 + i * 0.01, -1.5))
+            end = Location.objects.create(name=f'End {i}', point=Point(29.5 + i * 0.01, -1.5))
+            Event.objects.create(
+                title=f'Event {i}',
+                description='Test event',
+                event_type='battle',
+                severity='high',
+                location=start,
+                start_date=now,
+                created_by=user
+            )
+            Movement.objects.create(
+                name=f'Movement {i}',
+                movement_type='troops',
+                line=LineString(start.point, end.point),
+                start_location=start,
+                end_location=end,
+                start_date=now,
+                size=100,
+                created_by=user
+            )
+            square = Polygon.from_bbox((29 + i, -2, 29.5 + i, -1.5))
+            for days_ago, zone_status in ((10, 'occupied'), (0, 'contested')):
+                Area.objects.create(
+                    name=f'Zone {i}',
+                    polygon=MultiPolygon(square),
+                    status=zone_status,
+                    date=today - timezone.timedelta(days=days_ago),
+                    population=1000,
+                    created_by=user
+                )
+
+    def assertQueryBudget(self, budget, url, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+            if response.streaming:
+                content = b''.join(response.streaming_content)
+            else:
+                content = response.content
+        self.assertEqual(response.status_code, 200, content)
+        self.assertLessEqual(
+            len(context.captured_queries), budget,
+            f'{url} issued {len(context.captured_queries)} queries, budget is {budget}'
+        )
+
+    def test_location_endpoints(self):
+        self.assertQueryBudget(3, '/api/warmap/locations/')
+        self.assertQueryBudget(2, '/api/warmap/locations/nearby/', {
+            'lat': -1.5, 'lng': 29, 'radius': 100
+        })
+
+    def test_event_endpoints(self):
+        self.assertQueryBudget(3, '/api/warmap/events/')
+        self.assertQueryBudget(2, '/api/warmap/events/recent/')
+        self.assertQueryBudget(2, '/api/warmap/events/by_location/', {
+            'bounds': '28,-3,31,0'
+        })
+
+    def test_area_endpoints(self):
+        yesterday = timezone.now().date() - timezone.timedelta(days=1)
+        self.assertQueryBudget(3, '/api/warmap/areas/')
+        self.assertQueryBudget(4, '/api/warmap/areas/', {'include': 'history'})
+        self.assertQueryBudget(2, '/api/warmap/areas/current_status/')
+        self.assertQueryBudget(2, '/api/warmap/areas/status_changes/', {
+            'start_date': (yesterday - timezone.timedelta(days=30)).isoformat(),
+            'end_date': yesterday.isoformat()
+        })
+        self.assertQueryBudget(2, '/api/warmap/areas/zone_history/', {'name': 'Zone 0'})
+        self.assertQueryBudget(2, '/api/warmap/areas/statistics/')
+
+    def test_export_endpoints(self):
+        for endpoint in ('locations', 'events', 'areas', 'movements'):
+            self.assertQueryBudget(2, f'/api/warmap/{endpoint}/export/')
+
+    def test_movement_endpoints(self):
+        self.assertQueryBudget(3, '/api/warmap/movements/')
+        self.assertQueryBudget(2, '/api/warmap/movements/active/')
+        self.assertQueryBudget(2, '/api/warmap/movements/by_period/', {
+            'start': '2000-01-01',
+            'end': (timezone.now().date() + timezone.timedelta(days=1)).isoformat()
+        })
+
+
+class EventTimelineTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        location = Location.objects.create(name='Goma', point=Point(29.2, -1.7))
+        Event.objects.create(
+            title='Shelling',
+            description='Test event',
+            event_type='battle',
+            severity='high',
+            location=location,
+            start_date=timezone.now()
+        )
+
+    def get_json(self, url, params=None):
+        response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            return json.loads(b''.join(response.streaming_content))
+        return response.json()
+
+    def test_recent_has_the_same_schema_when_streamed(self):
+        page = self.get_json('/api/warmap/events/recent/')
+        streamed = self.get_json('/api/warmap/events/recent/', {'stream': 'true'})
+        self.assertEqual(streamed, page['results'])
+
+    def test_by_location_returns_a_list_of_events(self):
+        events = self.get_json('/api/warmap/events/by_location/', {'bounds': '28,-3,31,0'})
+        self.assertEqual([event['title'] for event in events], ['Shelling'])
+
+
+class ConditionalGetTests(APITestCase):
+    def test_time_dependent_actions_revalidate_as_time_passes(self):
+        later = timezone.now() + timezone.timedelta(days=1)
+        for url in ('/api/warmap/events/recent/', '/api/warmap/movements/active/',
+                    '/api/warmap/areas/current_status/', '/api/warmap/areas/statistics/'):
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            with mock.patch('core.versioning.timezone.now', return_value=later):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_committed_changes_revalidate(self):
+        url = '/api/warmap/locations/'
+        etag = self.client.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Location.objects.create(name='Goma', point=Point(29.2, -1.7))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_hits_do_not_rewrite_the_entry(self):
+        with mock.patch.object(
+            ResponseCacheMixin, 'store_response',
+            autospec=True, side_effect=ResponseCacheMixin.store_response
+        ) as store_response:
+            first = self.client.get('/api/warmap/areas/statistics/')
+            second = self.client.get('/api/warmap/areas/statistics/')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(store_response.call_count, 1)
+
+
+class LiveFeedRoutingTests(SimpleTestCase):
+    def event(self, point, verified=True):
+        location = Location(pk=1, name='Goma', point=point)
+        return Event(
+            pk=1, title='Shelling', event_type='battle', severity='high',
+            verified=verified, location=location, start_date=timezone.now()
+        )
+
+    def receive(self, subscription, message):
+        broadcaster = ViewportBroadcaster('test')
+        queue = object()
+        broadcaster.add(queue, subscription, bbox=subscription.bbox)
+        if queue not in broadcaster.subscribers_for(message):
+            return None
+
+        async def deliver():
+            async def source():
+                yield message
+            return [received async for received in subscription.messages(source())]
+        return asyncio.run(deliver())[0]
+
+    def test_event_leaving_the_viewport_is_removed(self):
+        subscription = Subscription([29, -2, 30, -1], ['events'], {})
+        message = event_message('updated', self.event(Point(35, 5)), self.event(Point(29.5, -1.5)))
+        self.assertEqual(self.receive(subscription, message)['action'], 'removed')
+
+    def test_event_no_longer_matching_a_filter_is_removed(self):
+        subscription = Subscription([29, -2, 30, -1], ['events'], {'verified': True})
+        message = event_message(
+            'updated', self.event(Point(29.5, -1.5), verified=False), self.event(Point(29.5, -1.5))
+        )
+        self.assertEqual(self.receive(subscription, message)['action'], 'removed')
+
+    def test_updates_elsewhere_are_not_delivered(self):
+        subscription = Subscription([29, -2, 30, -1], ['events'], {})
+        message = event_message('updated', self.event(Point(35, 5)), self.event(Point(36, 6)))
+        self.assertIsNone(self.receive(subscription, message))
+
+    def test_matching_update_is_delivered_unchanged(self):
+        subscription = Subscription([29, -2, 30, -1], ['events'], {})
+        message = event_message('updated', self.event(Point(29.6, -1.5)), self.event(Point(35, 5)))
+        self.assertEqual(self.receive(subscription, message)['action'], 'updated')
+
+
+class BulkUpsertTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('bulk', 'bulk@example.com', 'password')
+        cls.goma = Location.objects.create(name='Goma', point=Point(29.2, -1.7))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def location(self, name, x=29.0, y=-1.5, **fields):
+        return {'name': name, 'point': {'type': 'Point', 'coordinates': [x, y]}, **fields}
+
+    def event(self, title, location, **fields):
+        return {
+            'title': title,
+            'description': 'Bulk event',
+            'event_type': 'battle',
+            'severity': 'high',
+            'start_date': timezone.now().isoformat(),
+            'location': location,
+            **fields,
+        }
+
+    def post(self, endpoint, data, content_type='application/json'):
+        if content_type == 'application/json':
+            data = json.dumps(data)
+        return self.client.post(f'/api/warmap/{endpoint}/bulk/', data=data, content_type=content_type)
+
+    def test_creates_and_updates_locations(self):
+        response = self.post('locations', [
+            self.location('Bukavu'),
+            self.location('Goma city', id=self.goma.pk),
+        ])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.goma.refresh_from_db()
+        self.assertEqual(self.goma.name, 'Goma city')
+
+    def test_feature_collection_assigns_the_geometry(self):
+        response = self.post('locations', {'type': 'FeatureCollection', 'features': [{
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [28.8, -2.5]},
+            'properties': {'name': 'Bukavu'},
+        }]})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Location.objects.get(name='Bukavu').point.coords, (28.8, -2.5))
+
+    def test_ndjson_events_resolve_location_references(self):
+        lines = [
+            self.event('By id', self.goma.pk),
+            self.event('By name', 'Goma'),
+            self.event('By coordinates', {'coordinates': [29.2, -1.7]}),
+        ]
+        response = self.post(
+            'events', '\n'.join(json.dumps(line) for line in lines), 'application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(Event.objects.filter(location=self.goma).count(), 3)
+        self.assertEqual(Event.objects.filter(created_by=self.user).count(), 3)
+
+    def test_invalid_items_do_not_stop_valid_ones(self):
+        response = self.post('events', [
+            self.event('Valid', 'Goma'),
+            self.event('Unknown location', 'Kinshasa'),
+            self.event('Invalid', 'Goma', severity='apocalyptic'),
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['created', 'error', 'error']
+        )
+        self.assertIn('location', response.data['results'][1]['errors'])
+        self.assertIn('severity', response.data['results'][2]['errors'])
+
+    def test_all_invalid_items_return_400(self):
+        response = self.post('locations', [{'name': 'No point'}, self.location('Missing', id=0)])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'], 2)
+
+    def test_repeated_ids_apply_the_last_item(self):
+        response = self.post('locations', [
+            self.location('First', id=self.goma.pk),
+            self.location('Last', id=self.goma.pk),
+        ])
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['results'][0]['status'], 'error')
+        self.assertEqual(response.data['results'][1]['status'], 'updated')
+        self.goma.refresh_from_db()
+        self.assertEqual(self.goma.name, 'Last')
+
+    def test_database_errors_are_reported_per_item(self):
+        with mock.patch('django.db.models.QuerySet.bulk_create', side_effect=IntegrityError('conflict')):
+            response = self.post('locations', [self.location('Bukavu')])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][0]['status'], 'error')
+        self.assertFalse(Location.objects.filter(name='Bukavu').exists())
+
+
+class MovementPeriodTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('movements', 'movements@example.com', 'password')
+        cls.goma = Location.objects.create(name='Goma', point=Point(29.2, -1.7))
+        cls.bukavu = Location.objects.create(name='Bukavu', point=Point(28.8, -2.5))
+
+    def movement(self, start_date, end_date):
+        return {
+            'name': 'Convoy',
+            'movement_type': 'supplies',
+            'line': {'type': 'LineString', 'coordinates': [[29.2, -1.7], [28.8, -2.5]]},
+            'start_location': self.goma.pk,
+            'end_location': self.bukavu.pk,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'size': 10,
+        }
+
+    def test_reversed_period_is_a_validation_error(self):
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        response = self.client.post(
+            '/api/warmap/movements/bulk/',
+            data=json.dumps([self.movement(now, now - timezone.timedelta(days=1))]),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('end_date', response.data['results'][0]['errors'])
+
+    def test_database_rejects_reversed_period(self):
+        now = timezone.now()
+        with self.assertRaises(IntegrityError):
+            Movement.objects.create(
+                name='Convoy', movement_type='supplies',
+                line=LineString(self.goma.point, self.bukavu.point),
+                start_location=self.goma, end_location=self.bukavu,
+                start_date=now, end_date=now - timezone.timedelta(days=1), size=10
+            )
+
+
+def tile_for(lng, lat, z):
+    """x and y of the web mercator tile containing a point at zoom ``z``."""
+    n = 2 ** z
+    x = int((lng + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return x, y
+
+
+class TileTests(APITestCase):
+    z = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        today = timezone.now().date()
+        square = MultiPolygon(Polygon.from_bbox((29.1, -1.8, 29.3, -1.6)))
+        for days_ago, zone_status in ((30, 'occupied'), (0, 'contested')):
+            Area.objects.create(
+                name='Goma zone', polygon=square, status=zone_status,
+                date=today - timezone.timedelta(days=days_ago)
+            )
+        cls.month_ago = (today - timezone.timedelta(days=20)).isoformat()
+
+    def tile(self, lng=29.2, lat=-1.7, **params):
+        x, y = tile_for(lng, lat, self.z)
+        response = self.client.get(f'/api/warmap/tiles/areas/{self.z}/{x}/{y}.mvt', params)
+        self.assertEqual(response.status_code, 200)
+        return response.content
+
+    def test_tile_contains_the_zones_it_covers(self):
+        self.assertIn(b'Goma zone', self.tile())
+        self.assertEqual(self.tile(lng=10, lat=45), b'')
+
+    def test_tile_shows_the_latest_revision_as_of_the_date(self):
+        self.assertIn(b'contested', self.tile())
+        self.assertNotIn(b'occupied', self.tile())
+        self.assertIn(b'occupied', self.tile(date=self.month_ago))
+
+    def test_status_filter(self):
+        self.assertIn(b'Goma zone', self.tile(status='contested'))
+        self.assertEqual(self.tile(status='occupied'), b'')
+        self.assertEqual(self.tile(status='occupied', date=self.month_ago).count(b'Goma zone'), 1)
+
+    def test_invalid_coordinates(self):
+        response = self.client.get(f'/api/warmap/tiles/areas/{self.z}/{2 ** self.z}/0.mvt')
+        self.assertEqual(response.status_code, 400)
+
+
+class AreaSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.now().date()
+        cls.square = MultiPolygon(Polygon.from_bbox((29.1, -1.8, 29.3, -1.6)))
+
+    def revision(self, name, days_ago, zone_status):
+        return Area.objects.create(
+            name=name, polygon=self.square, status=zone_status,
+            date=self.today - timezone.timedelta(days=days_ago)
+        )
+
+    def snapshot(self):
+        return dict(AreaCurrentStatus.objects.values_list('name', 'status'))
+
+    def test_as_of_returns_the_latest_revision_on_or_before_the_date(self):
+        old = self.revision('Goma', 30, 'occupied')
+        new = self.revision('Goma', 0, 'contested')
+        bukavu = self.revision('Bukavu', 10, 'government')
+        ten_days_ago = self.today - timezone.timedelta(days=10)
+        self.assertEqual(set(Area.objects.as_of(self.today)), {new, bukavu})
+        self.assertEqual(set(Area.objects.as_of(ten_days_ago)), {old, bukavu})
+        self.assertEqual(set(Area.objects.as_of(self.today - timezone.timedelta(days=40))), set())
+
+    def test_rename_refreshes_both_names(self):
+        self.revision('Goma', 30, 'occupied')
+        latest = self.revision('Goma', 0, 'contested')
+        latest.name = 'Goma city'
+        latest.save()
+        self.assertEqual(self.snapshot(), {'Goma': 'occupied', 'Goma city': 'contested'})
+
+    def test_delete_falls_back_to_the_previous_revision(self):
+        old = self.revision('Goma', 30, 'occupied')
+        self.revision('Goma', 0, 'contested').delete()
+        self.assertEqual(AreaCurrentStatus.objects.get(name='Goma').area, old)
+        old.delete()
+        self.assertEqual(self.snapshot(), {})
+
+
+class AreaDailyStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.now().date()
+        cls.square = MultiPolygon(Polygon.from_bbox((29.1, -1.8, 29.3, -1.6)))
+
+    def days_ago(self, days):
+        return self.today - timezone.timedelta(days=days)
+
+    def revision(self, name, days_ago, zone_status, population=1000):
+        return Area.objects.create(
+            name=name, polygon=self.square, status=zone_status,
+            date=self.days_ago(days_ago), population=population
+        )
+
+    def test_compute_aggregates_the_latest_revisions(self):
+        self.revision('Goma', 30, 'occupied', population=100)
+        self.revision('Goma', 5, 'contested', population=200)
+        self.revision('Bukavu', 10, 'contested', population=300)
+        stats = AreaDailyStats.compute(self.today)
+        self.assertEqual(stats['total_zones'], 2)
+        self.assertEqual(stats['status_counts'], {'contested': 2})
+        self.assertEqual(stats['total_population'], 500)
+        self.assertEqual(AreaDailyStats.compute(self.days_ago(20))['status_counts'], {'occupied': 1})
+
+    def test_for_date_stores_the_rollup_on_a_miss(self):
+        self.revision('Goma', 30, 'occupied')
+        date = self.days_ago(20)
+        self.assertFalse(AreaDailyStats.objects.filter(pk=date).exists())
+        self.assertEqual(AreaDailyStats.for_date(date).total_zones, 1)
+        self.assertTrue(AreaDailyStats.objects.filter(pk=date).exists())
+
+    def test_for_date_does_not_overwrite_a_stored_rollup(self):
+        date = self.days_ago(20)
+        AreaDailyStats.objects.create(date=date, total_zones=7)
+        self.assertEqual(AreaDailyStats.for_date(date).total_zones, 7)
+
+    def test_backdated_revision_invalidates_later_days(self):
+        self.revision('Goma', 30, 'occupied')
+        for days in (25, 20, 15):
+            AreaDailyStats.for_date(self.days_ago(days))
+
+        self.revision('Goma', 22, 'liberated')
+        self.assertEqual(
+            set(AreaDailyStats.objects.values_list('date', flat=True)),
+            {self.days_ago(25), self.today}
+        )
+        self.assertEqual(AreaDailyStats.for_date(self.days_ago(20)).status_counts, {'liberated': 1})
+        self.assertEqual(AreaDailyStats.for_date(self.days_ago(25)).status_counts, {'occupied': 1})
+
+    def test_moving_a_revision_later_invalidates_from_its_previous_date(self):
+        revision = self.revision('Goma', 30, 'occupied')
+        AreaDailyStats.for_date(self.days_ago(20))
+        revision.date = self.days_ago(10)
+        revision.save()
+        self.assertEqual(AreaDailyStats.for_date(self.days_ago(20)).total_zones, 0)
+
+
+class GeometryOptionsTests(APITestCase):
+    def test_zoom_simplifies_rows_without_precomputed_columns(self):
+        # bulk_create skips the signal that fills polygon_low and polygon_medium
+        Area.objects.bulk_create([
+            Area(
+                name=f'Zone {i}', status='contested',
+                polygon=MultiPolygon(Polygon.from_bbox((29 + i, -2, 29.5 + i, -1.5)))
+            )
+            for i in range(3)
+        ])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/warmap/areas/', {'zoom': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.count(b'"MultiPolygon"'), 3)
+        self.assertLessEqual(len(context.captured_queries), 3)
+
+
+class BoundingBoxTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Location.objects.create(name='Goma', point=Point(29.2, -1.7))
+
+    def test_bbox_filters_locations(self):
+        response = self.client.get('/api/warmap/locations/', {'bbox': '29,-2,30,-1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        response = self.client.get('/api/warmap/locations/', {'bbox': '10,40,11,41'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_invalid_bboxes_are_rejected(self):
+        for bbox in ('nan,-2,30,-1', '29,-2,inf,-1', '-inf,-2,30,-1', '30,-2,29,-1',
+                     '29,-1,30,-2', '29,-2,200,-1', '29,-100,30,-1', '29,-2,30', 'a,b,c,d'):
+            response = self.client.get('/api/warmap/locations/', {'bbox': bbox})
+            self.assertEqual(response.status_code, 400, bbox)
+            response = self.client.get('/api/warmap/events/by_location/', {'bounds': bbox})
+            self.assertEqual(response.status_code, 400, bbox)
+
+
+def zone_feature(name, status, date, coordinates, population=None):
+    properties = {'name': name, 'status': status, 'date': date, 'population': population}
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Polygon', 'coordinates': [coordinates]},
+        'properties': {key: value for key, value in properties.items() if value is not None},
+    }
+
+
+class ImportAreasTests(TestCase):
+    date = datetime.date(2024, 5, 1)
+
+    def setUp(self):
+        self.goma = Area.objects.create(
+            name='Goma', status='occupied', date=self.date, population=1000,
+            polygon=MultiPolygon(Polygon.from_bbox((29.1, -1.8, 29.3, -1.6)))
+        )
+
+    def import_features(self, features):
+        handle, path = tempfile.mkstemp(suffix='.geojson')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w') as file:
+            json.dump({'type': 'FeatureCollection', 'features': features}, file)
+        out = io.StringIO()
+        call_command(
+            'import_areas', path, '--date-field', 'date', '--population-field', 'population',
+            stdout=out
+        )
+        return out.getvalue()
+
+    def test_imports_zones_and_records_replaced_revisions(self):
+        square = [[29.1, -1.8], [29.3, -1.8], [29.3, -1.6], [29.1, -1.6], [29.1, -1.8]]
+        # Self-intersecting, repaired by ST_MakeValid
+        bowtie = [[30, -3], [30.2, -2.8], [30.2, -3], [30, -2.8], [30, -3]]
+        output = self.import_features([
+            zone_feature('Goma', 'contested', '2024-05-01', square, population=1200),
+            zone_feature('Bukavu', 'government', '2024-05-01', square, population=500),
+            zone_feature('Uvira', 'occupied', '2024-05-01', bowtie),
+            zone_feature('', 'occupied', '2024-05-01', square),
+            zone_feature('Baraka', 'unknown', '2024-05-01', square),
+        ])
+        self.assertIn('Imported 2 new and 1 updated zone revisions, skipped 2 features', output)
+
+        self.goma.refresh_from_db()
+        self.assertEqual((self.goma.status, self.goma.population), ('contested', 1200))
+        self.assertEqual(set(Area.objects.values_list('name', flat=True)), {'Goma', 'Bukavu', 'Uvira'})
+        uvira = Area.objects.get(name='Uvira')
+        self.assertTrue(uvira.polygon.valid)
+        self.assertIsNotNone(uvira.polygon_low)
+
+        history = AreaHistory.objects.get()
+        self.assertEqual((history.area_id, history.status), (self.goma.pk, 'contested'))
+
+        self.assertEqual(
+            dict(AreaCurrentStatus.objects.values_list('name', 'status')),
+            {'Goma': 'contested', 'Bukavu': 'government', 'Uvira': 'occupied'}
+        )
+        stats = AreaDailyStats.objects.get(pk=timezone.now().date())
+        self.assertEqual(stats.total_zones, 3)
+        self.assertEqual(stats.total_population, 1700)
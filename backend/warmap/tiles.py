@@ -0,0 +1,170 @@
+"""Mapbox Vector Tile generation for the war map layers.
+
+Tiles are encoded entirely in PostGIS with ``ST_AsMVT``/``ST_AsMVTGeom`` so
+geometries never have to be loaded into Python.
+"""
+from django.db import connection
+from django.utils import timezone
+
+TILE_EXTENT = 4096
+TILE_BUFFER = 64
+MAX_ZOOM = 22
+
+# Width of the web mercator world in meters
+WEB_MERCATOR_WIDTH = 40075016.68557849
+
+# Envelope of the requested tile in SRID 4326, usable inside a layer source
+TILE_BOUNDS = '(SELECT ST_Transform(geom, 4326) FROM bounds)'
+
+
+class TileLayer:
+    """Describes how one warmap model is rendered into a vector tile layer.
+
+    ``source`` is a SQL fragment selecting the candidate rows, aliased as
+    ``t`` with a ``geom`` column in SRID 4326, or a callable returning that
+    fragment and its arguments. Sources the planner cannot filter by the
+    tile, such as ``DISTINCT ON`` queries, test ``TILE_BOUNDS`` themselves.
+    ``filters`` maps query parameters to SQL conditions on ``t``; every
+    placeholder in a condition receives the parameter value.
+    """
+
+    def __init__(self, name, source, properties, filters=None, simplify=True):
+        self.name = name
+        self.source = source
+        self.properties = properties
+        self.filters = filters or {}
+        self.simplify = simplify
+
+    def build_query(self, z, x, y, params):
+        source, source_args = self.source, []
+        if callable(source):
+            source, source_args = source(params)
+
+        where = [f't.geom && {TILE_BOUNDS}']
+        filter_args = []
+        for param, condition in self.filters.items():
+            value = params.get(param)
+            if value not in (None, ''):
+                where.append(condition)
+                filter_args.extend([value] * condition.count('%s'))
+
+        geom = 'ST_Transform(t.geom, 3857)'
+        geom_args = []
+        if self.simplify:
+            geom = f'ST_SimplifyPreserveTopology({geom}, %s)'
+            geom_args.append(simplify_tolerance(z))
+        columns = ', '.join(f't.{column}' for column in self.properties)
+
+        sql = f'''
+            WITH bounds AS (
+                SELECT ST_TileEnvelope(%s, %s, %s) AS geom
+            ),
+            mvtgeom AS (
+                SELECT
+                    ST_AsMVTGeom({geom}, bounds.geom, {TILE_EXTENT}, {TILE_BUFFER}, true) AS geom,
+                    {columns}
+                FROM ({source}) t, bounds
+                WHERE {' AND '.join(where)}
+            )
+            SELECT ST_AsMVT(mvtgeom.*, %s, {TILE_EXTENT}, 'geom')
+            FROM mvtgeom
+            WHERE mvtgeom.geom IS NOT NULL
+        '''
+        args = [z, x, y, *geom_args, *source_args, *filter_args, self.name]
+        return sql, args
+
+
+def simplify_tolerance(z):
+    """Size of one tile unit in web mercator meters at zoom ``z``."""
+    return WEB_MERCATOR_WIDTH / (TILE_EXTENT * 2 ** z)
+
+
+def _area_source(params):
+    # Latest revision of each zone as of the requested date, like
+    # Area.objects.as_of(): the snapshot serves zones not revised since,
+    # the others need an as-of lookup
+    date = params.get('date') or timezone.now().date()
+    return f'''
+        SELECT a.id, a.name, a.status, a.date, a.population, a.strategic_value, a.polygon AS geom
+        FROM warmap_areacurrentstatus s
+        JOIN warmap_area a ON a.id = s.area_id
+        WHERE s.date <= %s AND a.polygon && {TILE_BOUNDS}
+        UNION ALL
+        (
+            SELECT DISTINCT ON (name)
+                id, name, status, date, population, strategic_value, polygon AS geom
+            FROM warmap_area
+            WHERE date <= %s
+              AND name IN (SELECT name FROM warmap_areacurrentstatus WHERE date > %s)
+              -- DISTINCT ON keeps the tile test from being pushed down
+              AND name IN (SELECT name FROM warmap_area WHERE polygon && {TILE_BOUNDS})
+            ORDER BY name, date DESC
+        )
+    ''', [date, date, date]
+
+
+ACTIVE_ON_DATE = (
+    't.start_date::date <= %s::date AND '
+    '(t.end_date IS NULL OR t.end_date::date >= %s::date)'
+)
+
+
+LAYERS = {
+    'areas': TileLayer(
+        name='areas',
+        source=_area_source,
+        properties=['id', 'name', 'status', 'date', 'population', 'strategic_value'],
+        filters={
+            'status': 't.status = %s',
+        },
+    ),
+    'events': TileLayer(
+        name='events',
+        source='''
+            SELECT
+                e.id, e.title, e.event_type, e.severity, e.start_date,
+                e.end_date, e.casualties, e.verified, l.point AS geom
+            FROM warmap_event e
+            JOIN warmap_location l ON l.id = e.location_id
+        ''',
+        properties=['id', 'title', 'event_type', 'severity', 'start_date',
+                    'end_date', 'casualties', 'verified'],
+        filters={
+            'event_type': 't.event_type = %s',
+            'severity': 't.severity = %s',
+            'verified': 't.verified = %s',
+            'date': ACTIVE_ON_DATE,
+        },
+        simplify=False,
+    ),
+    'locations': TileLayer(
+        name='locations',
+        source='SELECT id, name, point AS geom FROM warmap_location',
+        properties=['id', 'name'],
+        simplify=False,
+    ),
+    'movements': TileLayer(
+        name='movements',
+        source='''
+            SELECT
+                id, name, movement_type, start_date, end_date, size,
+                start_location_id, end_location_id, line AS geom
+            FROM warmap_movement
+        ''',
+        properties=['id', 'name', 'movement_type', 'start_date', 'end_date',
+                    'size', 'start_location_id', 'end_location_id'],
+        filters={
+            'movement_type': 't.movement_type = %s',
+            'date': ACTIVE_ON_DATE,
+        },
+    ),
+}
+
+
+def render_tile(layer, z, x, y, params):
+    """Return the encoded MVT bytes for ``layer`` at tile ``z/x/y``."""
+    sql, args = layer.build_query(z, x, y, params)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, args)
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] else b''
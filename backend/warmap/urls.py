@@ -9,5 +9,11 @@ router.register(r'areas', views.AreaViewSet)
 router.register(r'movements', views.MovementViewSet)
 
 urlpatterns = [
+    path(
+        'tiles/<str:layer>/<int:z>/<int:x>/<int:y>.mvt',
+        views.TileView.as_view(),
+        name='warmap-tile'
+    ),
+    path('live/', views.LiveFeedView.as_view(), name='warmap-live'),
     path('', include(router.urls)),
 ]
@@ -1,112 +1,326 @@
+import json
+
 from django.shortcuts import render
 from django.utils import timezone
 from django.contrib.gis.geos import Point, Polygon, LineString
-from django.contrib.gis.measure import D
-from django.db.models import Q
+from django.contrib.gis.db.models import GeometryField, PointField
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Exists, OuterRef, Prefetch, Q, Value
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticatedOrReadOnly
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Location, Event, Area, Movement
+from core.broadcast import event_stream_response
+from core.caching import ResponseCacheMixin
+from core.versioning import ConditionalGetMixin
+from .bulk import BulkUpsertMixin
+from .filters import BoundingBoxFilter, parse_bbox
+from .live import (
+    Subscription,
+    event_message,
+    feature_broadcaster,
+    movement_message,
+    publish_many
+)
+from .functions import (
+    GeographyDistance,
+    GeographyDWithin,
+    KNNDistance,
+    Multi,
+    SimplifyPreserveTopology
+)
+from .models import (
+    ZOOM_BANDS,
+    Location,
+    Event,
+    Area,
+    AreaHistory,
+    AreaDailyStats,
+    Movement,
+    location_geography,
+    movement_period
+)
 from .serializers import (
     LocationSerializer,
+    LocationBulkSerializer,
+    NearbyLocationSerializer,
     EventSerializer,
+    EventBulkSerializer,
     AreaSerializer,
-    MovementSerializer
+    AreaHistorySerializer,
+    MovementSerializer,
+    MovementBulkSerializer
 )
+from .pagination import AreaHistoryCursorPagination, TimelineCursorPagination
+from .streaming import GeoJSONStreamMixin
+from .tiles import LAYERS, MAX_ZOOM, render_tile
+
+class GeometryOptionsMixin:
+    """Let clients ask for lighter geometry on read requests.
+
+    ``?zoom=`` selects a standard simplification band, ``?simplify=`` sets an
+    explicit tolerance in degrees and ``?precision=`` limits the number of
+    coordinate decimals. The geometry is simplified and encoded with
+    ST_AsGeoJSON in the database and the raw column is never loaded.
+    """
+    geometry_field = None
+    # Precomputed simplified columns, by the max zoom of their band
+    simplified_geometries = {}
+    max_precision = 15
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return self.apply_geometry_options(queryset, self.simplified_geometries)
 
-class LocationViewSet(viewsets.ModelViewSet):
+    def apply_geometry_options(self, queryset, simplified_geometries=None):
+        simplified_geometries = simplified_geometries or {}
+        if simplified_geometries:
+            queryset = queryset.defer(*simplified_geometries.values())
+
+        expression, precision = self.get_geometry_options(simplified_geometries)
+        if expression is None and precision is None:
+            return queryset
+        return queryset.annotate(**{
+            f'{self.geometry_field}_geojson': AsGeoJSON(
+                expression or self.geometry_field,
+                precision=self.max_precision if precision is None else precision
+            )
+        }).defer(self.geometry_field)
+
+    def get_geometry_options(self, simplified_geometries):
+        params = self.request.query_params
+        expression, precision = None, None
+        try:
+            if params.get('zoom'):
+                zoom = int(params['zoom'])
+                for max_zoom, tolerance, band_precision in ZOOM_BANDS:
+                    if zoom <= max_zoom:
+                        expression = SimplifyPreserveTopology(self.geometry_field, tolerance)
+                        column = simplified_geometries.get(max_zoom)
+                        if column:
+                            # Rows written without the save signal, e.g. by
+                            # bulk_create, have no precomputed column yet
+                            expression = Coalesce(
+                                column, Multi(expression), output_field=GeometryField(srid=4326)
+                            )
+                        precision = band_precision
+                        break
+            if params.get('simplify'):
+                tolerance = float(params['simplify'])
+                if tolerance < 0:
+                    raise ValueError
+                expression = SimplifyPreserveTopology(self.geometry_field, tolerance)
+            if params.get('precision'):
+                precision = int(params['precision'])
+                if not 0 <= precision <= self.max_precision:
+                    raise ValueError
+        except ValueError:
+            raise ValidationError({
+                'error': 'Invalid geometry parameters. Use an integer zoom, '
+                         'a non-negative simplify tolerance and a precision '
+                         f'between 0 and {self.max_precision}'
+            })
+        return expression, precision
+
+class LocationViewSet(ConditionalGetMixin, GeometryOptionsMixin, GeoJSONStreamMixin, BulkUpsertMixin, viewsets.ModelViewSet):
     queryset = Location.objects.all()
     serializer_class = LocationSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    version_models = ['warmap.Location']
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, BoundingBoxFilter]
     filterset_fields = ['name']
     search_fields = ['name', 'description']
+    bbox_filter_field = 'point'
+    geometry_field = 'point'
+    bulk_serializer_class = LocationBulkSerializer
+    bulk_geometry_field = 'point'
 
     @action(detail=False, methods=['get'])
     def nearby(self, request):
-        """Get locations within a specified radius of a point."""
+        """Get locations within a specified radius of a point, nearest first.
+
+        ``limit`` returns only the k nearest locations; without ``radius`` the
+        search is not bounded by distance.
+        """
         try:
             lat = float(request.query_params.get('lat', 0))
             lng = float(request.query_params.get('lng', 0))
-            radius = float(request.query_params.get('radius', 10))  # in kilometers
-            
-            point = Point(lng, lat, srid=4326)
-            locations = Location.objects.filter(
-                point__distance_lte=(point, D(km=radius))
+            radius = request.query_params.get('radius')
+            limit = request.query_params.get('limit')
+            limit = int(limit) if limit else None
+            if limit is not None and limit < 1:
+                raise ValueError
+            if radius is None and limit is None:
+                radius = 10  # in kilometers
+        except (ValueError, TypeError):
+            return Response(
+                {'error': 'Invalid parameters'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-            
-            serializer = self.get_serializer(locations, many=True)
-            return Response(serializer.data)
+
+        try:
+            center = Value(
+                Point(lng, lat, srid=4326),
+                output_field=PointField(geography=True)
+            )
+            geography = location_geography()
+            locations = self.filter_queryset(self.get_queryset()).annotate(
+                distance_km=GeographyDistance(geography, center) / 1000
+            )
+            if radius is not None:
+                locations = locations.filter(
+                    GeographyDWithin(geography, center, float(radius) * 1000)
+                )
+            # Order with the KNN operator so the geography index is walked
+            locations = locations.order_by(KNNDistance(geography, center))
+            if limit is not None:
+                locations = locations[:limit]
         except (ValueError, TypeError):
             return Response(
                 {'error': 'Invalid parameters'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class EventViewSet(viewsets.ModelViewSet):
-    queryset = Event.objects.all()
+        serializer = NearbyLocationSerializer(
+            locations,
+            many=True,
+            context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+class EventViewSet(ConditionalGetMixin, GeoJSONStreamMixin, BulkUpsertMixin, viewsets.ModelViewSet):
+    queryset = Event.objects.select_related('location', 'created_by')
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    version_models = ['warmap.Event', 'warmap.Location']
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, BoundingBoxFilter]
     filterset_fields = ['event_type', 'severity', 'verified']
     search_fields = ['title', 'description']
+    bbox_filter_field = 'location__point'
+    stream_related_locations = ['location']
+    pagination_class = TimelineCursorPagination
+    bulk_serializer_class = EventBulkSerializer
+    bulk_location_fields = ['location']
+    # A feature's point identifies the event's location
+    bulk_geometry_field = 'location'
+    time_sensitive_actions = ['recent']
+    # Timelines return EventSerializer objects whether paginated or streamed;
+    # only /export/ wraps them in GeoJSON features
+    serializer_is_geojson = False
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def publish_bulk_changes(self, changes):
+        publish_many(event_message, changes)
+
+    def get_feature(self, instance, data):
+        return {
+            'type': 'Feature',
+            'id': instance.pk,
+            'geometry': json.loads(instance.location_point_geojson),
+            'properties': data
+        }
+
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """Get recent events within a specified time period."""
         days = int(request.query_params.get('days', 7))
-        cutoff = timezone.now() - timezone.timedelta(days=days)
+        cutoff = self.request_time() - timezone.timedelta(days=days)
         
-        events = self.get_queryset().filter(
+        events = self.filter_queryset(self.get_queryset()).filter(
             start_date__gte=cutoff
-        ).order_by('-start_date')
+        )
         
-        serializer = self.get_serializer(events, many=True)
-        return Response(serializer.data)
+        return self.paginate_or_stream(events)
 
     @action(detail=False, methods=['get'])
     def by_location(self, request):
         """Get events within a specified area."""
         try:
-            bounds = request.query_params.get('bounds', '').split(',')
-            if len(bounds) != 4:
-                raise ValueError
-                
-            min_lng, min_lat, max_lng, max_lat = map(float, bounds)
-            bbox = Polygon.from_bbox((min_lng, min_lat, max_lng, max_lat))
-            
-            events = self.get_queryset().filter(
-                location__point__contained=bbox
-            )
-            
-            serializer = self.get_serializer(events, many=True)
-            return Response(serializer.data)
-        except (ValueError, TypeError):
+            bbox = parse_bbox(request.query_params.get('bounds', ''))
+        except ValueError:
             return Response(
                 {'error': 'Invalid bounds parameter'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-class AreaViewSet(viewsets.ModelViewSet):
-    queryset = Area.objects.all()
+        events = self.filter_queryset(self.get_queryset()).filter(
+            location__point__bboverlaps=bbox,
+            location__point__intersects=bbox
+        )
+
+        return self.stream(events, geojson=False)
+
+class AreaViewSet(ResponseCacheMixin, GeometryOptionsMixin, GeoJSONStreamMixin, viewsets.ModelViewSet):
+    queryset = Area.objects.select_related('created_by')
     serializer_class = AreaSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    version_models = ['warmap.Area']
+    cache_actions = ['current_status', 'statistics', 'status_changes', 'zone_history']
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, BoundingBoxFilter]
     filterset_fields = ['status', 'name']
     search_fields = ['name', 'description']
+    bbox_filter_field = 'polygon'
+    geometry_field = 'polygon'
+    simplified_geometries = Area.SIMPLIFIED_POLYGONS
+    # Number of history revisions summarized per zone with ?include=history
+    history_summary_limit = 20
+
+    def get_etag_extra(self):
+        # Without ?date= these actions describe today
+        if self.action in ('current_status', 'statistics') and not self.request.query_params.get('date'):
+            return self.request_time().date()
+        return super().get_etag_extra()
+
+    def include_history(self):
+        include = self.request.query_params.get('include', '')
+        return 'history' in include.split(',')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.include_history():
+            queryset = queryset.prefetch_related(Prefetch(
+                'history',
+                queryset=AreaHistory.objects.only(
+                    'id', 'area_id', 'status', 'date', 'recorded_at'
+                )[:self.history_summary_limit]
+            ))
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_history'] = self.include_history()
+        return context
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Get the recorded revisions of a zone as GeoJSON features."""
+        area = self.get_object()
+        history = self.apply_geometry_options(
+            AreaHistory.objects.filter(area=area)
+        )
+        paginator = AreaHistoryCursorPagination()
+        page = paginator.paginate_queryset(history, request, view=self)
+        serializer = AreaHistorySerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=False, methods=['get'])
     def current_status(self, request):
         """Get the current status of all zones."""
-        date = request.query_params.get('date', timezone.now().date())
+        date = request.query_params.get('date') or self.request_time().date()
         if isinstance(date, str):
             try:
                 date = timezone.datetime.strptime(date, '%Y-%m-%d').date()
@@ -117,25 +331,9 @@ class AreaViewSet(viewsets.ModelViewSet):
                 )
 
         # Get the latest status for each zone up to the specified date
-        latest_areas = Area.objects.raw('''
-            WITH RankedAreas AS (
-                SELECT *,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY name 
-                        ORDER BY date DESC
-                    ) as rn
-                FROM warmap_area
-                WHERE date <= %s
-            )
-            SELECT * FROM RankedAreas WHERE rn = 1
-        ''', [date])
+        latest_areas = self.filter_queryset(self.get_queryset()).as_of(date)
 
-        serializer = self.get_serializer(latest_areas, many=True)
-        # Format response as GeoJSON FeatureCollection
-        return Response({
-            "type": "FeatureCollection",
-            "features": serializer.data["features"] if "features" in serializer.data else []
-        })
+        return self.stream(latest_areas)
 
     @action(detail=False, methods=['get'])
     def status_changes(self, request):
@@ -155,28 +353,15 @@ class AreaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Find zones that changed status between the dates
-        changed_zones = Area.objects.raw('''
-            WITH StartStatus AS (
-                SELECT DISTINCT ON (name) *
-                FROM warmap_area
-                WHERE date <= %s
-                ORDER BY name, date DESC
-            ),
-            EndStatus AS (
-                SELECT DISTINCT ON (name) *
-                FROM warmap_area
-                WHERE date <= %s
-                ORDER BY name, date DESC
-            )
-            SELECT e.* 
-            FROM EndStatus e
-            JOIN StartStatus s ON e.name = s.name
-            WHERE e.status != s.status
-        ''', [start_date, end_date])
+        # Find zones whose latest status differs between the dates
+        start_status = Area.objects.as_of(start_date).filter(
+            name=OuterRef('name')
+        ).exclude(status=OuterRef('status'))
+        changed_zones = self.filter_queryset(self.get_queryset()).as_of(end_date).filter(
+            Exists(start_status)
+        )
 
-        serializer = self.get_serializer(changed_zones, many=True)
-        return Response(serializer.data)
+        return self.stream(changed_zones)
 
     @action(detail=False, methods=['get'])
     def zone_history(self, request):
@@ -188,14 +373,13 @@ class AreaViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        history = Area.objects.filter(name=zone_name).order_by('date')
-        serializer = self.get_serializer(history, many=True)
-        return Response(serializer.data)
+        history = self.filter_queryset(self.get_queryset()).filter(name=zone_name).order_by('date')
+        return self.stream(history)
 
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get statistics about zone control."""
-        date = request.query_params.get('date', timezone.now().date())
+        date = request.query_params.get('date') or self.request_time().date()
         if isinstance(date, str):
             try:
                 date = timezone.datetime.strptime(date, '%Y-%m-%d').date()
@@ -205,68 +389,45 @@ class AreaViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        # Get latest status of all zones up to the specified date
-        latest_areas = Area.objects.raw('''
-            WITH RankedAreas AS (
-                SELECT *,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY name 
-                        ORDER BY date DESC
-                    ) as rn
-                FROM warmap_area
-                WHERE date <= %s
-            )
-            SELECT * FROM RankedAreas WHERE rn = 1
-        ''', [date])
-
-        # Calculate statistics
-        stats = {
-            'total_zones': len(list(latest_areas)),
-            'status_counts': {},
-            'total_population': 0,
-            'population_by_status': {},
-            'strategic_value_by_status': {}
-        }
+        # Served from the daily rollup, computed with a single GROUP BY on a miss
+        stats = AreaDailyStats.for_date(date)
 
-        for area in latest_areas:
-            # Count zones by status
-            stats['status_counts'][area.status] = stats['status_counts'].get(area.status, 0) + 1
-            
-            # Sum population by status
-            if area.population:
-                stats['total_population'] += area.population
-                stats['population_by_status'][area.status] = (
-                    stats['population_by_status'].get(area.status, 0) + area.population
-                )
-            
-            # Sum strategic value by status
-            stats['strategic_value_by_status'][area.status] = (
-                stats['strategic_value_by_status'].get(area.status, 0) + area.strategic_value
-            )
-
-        return Response(stats)
+        return Response(stats.as_dict())
 
-class MovementViewSet(viewsets.ModelViewSet):
-    queryset = Movement.objects.all()
+class MovementViewSet(ConditionalGetMixin, GeometryOptionsMixin, GeoJSONStreamMixin, BulkUpsertMixin, viewsets.ModelViewSet):
+    queryset = Movement.objects.select_related(
+        'start_location', 'end_location', 'created_by'
+    )
     serializer_class = MovementSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    version_models = ['warmap.Movement', 'warmap.Location']
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, BoundingBoxFilter]
     filterset_fields = ['movement_type']
     search_fields = ['name', 'description']
+    bbox_filter_field = 'line'
+    geometry_field = 'line'
+    stream_related_locations = ['start_location', 'end_location']
+    pagination_class = TimelineCursorPagination
+    bulk_serializer_class = MovementBulkSerializer
+    bulk_location_fields = ['start_location', 'end_location']
+    bulk_geometry_field = 'line'
+    time_sensitive_actions = ['active']
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def publish_bulk_changes(self, changes):
+        publish_many(movement_message, changes)
+
     @action(detail=False, methods=['get'])
     def active(self, request):
         """Get currently active movements."""
-        now = timezone.now()
-        movements = self.get_queryset().filter(
+        now = self.request_time()
+        movements = self.filter_queryset(self.get_queryset()).filter(
             Q(end_date__isnull=True) |
             Q(start_date__lte=now, end_date__gte=now)
         )
-        serializer = self.get_serializer(movements, many=True)
-        return Response(serializer.data)
+        return self.paginate_or_stream(movements)
 
     @action(detail=False, methods=['get'])
     def by_period(self, request):
@@ -278,16 +439,115 @@ class MovementViewSet(viewsets.ModelViewSet):
             start_date = timezone.datetime.strptime(start_str, '%Y-%m-%d')
             end_date = timezone.datetime.strptime(end_str, '%Y-%m-%d')
             
-            movements = self.get_queryset().filter(
-                Q(start_date__range=(start_date, end_date)) |
-                Q(end_date__range=(start_date, end_date)) |
-                Q(start_date__lte=start_date, end_date__gte=end_date)
+            # Range overlap is served by the GiST index on the movement period
+            movements = self.filter_queryset(self.get_queryset()).alias(period=movement_period()).filter(
+                period__overlap=DateTimeTZRange(start_date, end_date, '[]')
             )
-            
-            serializer = self.get_serializer(movements, many=True)
-            return Response(serializer.data)
         except (ValueError, TypeError):
             return Response(
                 {'error': 'Invalid date parameters (use YYYY-MM-DD)'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+
+        return self.paginate_or_stream(movements)
+
+
+class MVTRenderer(BaseRenderer):
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        return b''
+
+class TileView(ConditionalGetMixin, APIView):
+    """Serve Mapbox Vector Tiles for the warmap layers."""
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    version_models = ['warmap.Area', 'warmap.Event', 'warmap.Location', 'warmap.Movement']
+    renderer_classes = [JSONRenderer, MVTRenderer]
+
+    def get_etag_extra(self):
+        # Without ?date= area tiles show the zones as of today
+        if self.kwargs.get('layer') == 'areas' and not self.request.query_params.get('date'):
+            return self.request_time().date()
+        return None
+
+    def get(self, request, layer, z, x, y):
+        tile_layer = LAYERS.get(layer)
+        if tile_layer is None:
+            return Response(
+                {'error': f"Unknown layer '{layer}'"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        if z > MAX_ZOOM or x >= 2 ** z or y >= 2 ** z:
+            return Response(
+                {'error': 'Invalid tile coordinates'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        params = {
+            key: request.query_params.get(key)
+            for key in ('status', 'event_type', 'severity', 'movement_type')
+        }
+        date = request.query_params.get('date')
+        try:
+            params['date'] = (
+                timezone.datetime.strptime(date, '%Y-%m-%d').date() if date else None
+            )
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format. Use YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        verified = request.query_params.get('verified')
+        if verified is not None:
+            params['verified'] = verified.lower() in ('true', '1')
+
+        tile = render_tile(tile_layer, z, x, y, params)
+        return HttpResponse(tile, content_type=MVTRenderer.media_type)
+
+class LiveFeedView(APIView):
+    """Server-Sent Events with Event and Movement changes inside a viewport."""
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    layers = ['events', 'movements']
+
+    def get(self, request):
+        bbox = request.query_params.get('bbox')
+        if bbox:
+            try:
+                bbox = list(parse_bbox(bbox).extent)
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid bbox parameter. Use min_lng,min_lat,max_lng,max_lat'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        layers = request.query_params.get('layers')
+        layers = layers.split(',') if layers else self.layers
+        unknown = set(layers) - set(self.layers)
+        if unknown:
+            return Response(
+                {'error': f"Unknown layer '{sorted(unknown)[0]}'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        filters = {
+            key: request.query_params[key]
+            for key in ('event_type', 'severity', 'movement_type')
+            if request.query_params.get(key)
+        }
+        verified = request.query_params.get('verified')
+        if verified is not None:
+            filters['verified'] = verified.lower() in ('true', '1')
+
+        subscription = Subscription(bbox, layers, filters)
+        messages = feature_broadcaster.subscribe(subscription, bbox=bbox)
+        return event_stream_response(
+            {'bbox': bbox, 'layers': layers, 'filters': filters},
+            subscription.messages(messages),
+            'feature',
+            initial_event='subscribed'
+        )